@@ -0,0 +1,273 @@
+from decider import ThresholdDecider
+from deck import Deck
+from eventlog import EventLog
+from game import Game
+import numpy as np
+import random
+import sys
+import time
+
+"""
+BatchSimulator class that plays many games of Sabaac at once, one per table,
+with NumPy arrays holding every table's state (a struct of arrays rather than
+a Game object per table). Every player uses the same fixed policy as a
+ThresholdDecider: they always call (or go all-in), never fold, and Draw until
+their hand value reaches their stand value.
+
+Rounds are played like Game.doRound, for every table in lockstep: the Sabaac
+pot ante (eliminating broke players), dealing, the Ante Betting Phase, the
+Draw Phase, the Final Betting Phase and resolving the round, with a
+SHIFT_CHANCE chance of a Shift after every betting phase and every turn in the
+Draw Phase. Rounds are resolved by the same rules as resolveRound: bombing out,
+Pure Sabaac and Idiot's Array, with ties losing the hand pot to the Sabaac pot.
+The random numbers are drawn differently, so a table won't play out like a Game
+with the same seed, but the results follow the same distribution.
+
+Each table's deck is a row of a numTables x 76 matrix of card ids. Decks are
+shuffled lazily: drawing the card at position i first swaps it with a random
+card at or after i, which is the Fisher-Yates shuffle carried out one draw at
+a time, so only the cards actually drawn are shuffled. Since nothing is
+discarded, the cards in players' hands are exactly the cards drawn so far, so
+hands aren't stored separately: a matching matrix holds the seat that owns
+each drawn card, and a Shift shuffles the owners of a table's drawn cards.
+"""
+class BatchSimulator:
+    NO_OWNER = -1   # Owner of the cards that haven't been drawn
+
+    # Values of every card, indexed by card id
+    CARD_VALUES = np.array([card.getValue() for card in Deck.CARDS], dtype=np.int32)
+
+    # Bit 1 for the Idiot, 2 for a 2 and 4 for a 3 indexed by card id, so an
+    # Idiot's Array has all 3 bits
+    CARD_FLAGS = np.array([{ 0: 1, 2: 2, 3: 4 }.get(card.getValue(), 0) for card in Deck.CARDS], dtype=np.uint8)
+    IDIOTS_ARRAY_FLAGS = 7
+
+    # Constructor with the number of tables, the number of players at each
+    # table, their starting chips, the hand value each player stands at (one
+    # for everyone or one per seat), and an optional seed
+    def __init__(self, numTables, numPlayers, startingChips = 30, standValues = 18, seed = None):
+        self.numTables = numTables
+        self.numPlayers = numPlayers
+        self.standValues = np.broadcast_to(np.array(standValues, dtype=np.int32), (numPlayers,)).copy()
+        self.rng = np.random.default_rng(seed)
+
+        self.chips = np.full((numTables, numPlayers), startingChips, dtype=np.int32)
+        self.alive = np.ones((numTables, numPlayers), dtype=bool)      # Players who haven't been eliminated
+        self.handPots = np.zeros(numTables, dtype=np.int32)
+        self.sabaacPots = np.zeros(numTables, dtype=np.int32)
+        self.roundsPlayed = np.zeros(numTables, dtype=np.int32)
+
+        self.decks = np.tile(np.arange(Deck.NUM_CARDS, dtype=np.uint8), (numTables, 1))
+        self.deckPositions = np.zeros(numTables, dtype=np.int32)     # Number of cards drawn from each deck
+        self.owners = np.full((numTables, Deck.NUM_CARDS), BatchSimulator.NO_OWNER, dtype=np.int8)  # Seat holding each card in the decks
+        self.totals = np.zeros((numTables, numPlayers), dtype=np.int32)
+
+        # Totals over every table and round
+        self.numRounds = 0
+        self.numShifts = 0
+        self.numTies = 0
+        self.numSabaacWins = 0
+
+    # Returns which tables still have a game going: two or more players left,
+    # and fewer than maxRounds rounds played if given
+    def getRunning(self, maxRounds = None):
+        running = self.alive.sum(axis=1) > 1
+        if maxRounds != None:
+            running &= self.roundsPlayed < maxRounds
+        return running
+
+    # Plays rounds until every table's game is over, or until maxRounds rounds
+    # have been played if given
+    def playGame(self, maxRounds = None):
+        running = self.getRunning(maxRounds)
+        while running.any():
+            self.playRound(running)
+            running = self.getRunning(maxRounds)
+
+    # Plays a round at every table in the given mask
+    def playRound(self, tables):
+        self.roundsPlayed += tables
+        tables = np.flatnonzero(tables)
+
+        # Sabaac pot ante (forced), eliminating players who can't pay it
+        alive = self.alive[tables] & (self.chips[tables] > Game.SABAAC_POT_ANTE)
+        self.alive[tables] = alive
+        self.chips[tables] -= Game.SABAAC_POT_ANTE * alive
+        self.sabaacPots[tables] += Game.SABAAC_POT_ANTE * alive.sum(axis=1, dtype=np.int32)
+        tables = tables[alive.sum(axis=1) > 1]
+        self.numRounds += len(tables)
+
+        self.resetRound(tables)
+        self.dealCards(tables)
+        self.doBettingPhase(tables)
+        self.attemptShift(tables)
+        self.doDrawingPhase(tables)
+        self.attemptShift(tables)   # Nothing is paid in the Final Betting Phase, since everyone checks
+        self.resolveRound(tables)
+
+    # Empties every hand and resets the hand pot and deck at the given tables
+    # (an array of table indices, like the tables of the methods below)
+    def resetRound(self, tables):
+        self.owners[tables] = BatchSimulator.NO_OWNER
+        self.totals[tables] = 0
+        self.handPots[tables] = 0
+        self.decks[tables] = np.arange(Deck.NUM_CARDS, dtype=np.uint8)
+        self.deckPositions[tables] = 0
+
+    # Draws a card for the player in the given seat at each of the given
+    # tables, shuffling it into place first
+    def drawCards(self, tables, seat):
+        if len(tables) == 0:
+            return
+        positions = self.deckPositions[tables]
+        swapWith = positions + (self.rng.random(len(tables), dtype=np.float32) * (Deck.NUM_CARDS - positions)).astype(np.int32)
+
+        # Index the flattened matrices, which is faster than indexing rows and
+        # columns
+        decks = self.decks.reshape(-1)
+        rowStarts = tables * Deck.NUM_CARDS
+        drawnIndices = rowStarts + positions
+        swapIndices = rowStarts + swapWith
+        cards = decks[swapIndices]
+        decks[swapIndices] = decks[drawnIndices]
+        decks[drawnIndices] = cards
+        self.deckPositions[tables] = positions + 1
+        self.owners.reshape(-1)[drawnIndices] = seat
+        self.totals.reshape(-1)[tables * self.numPlayers + seat] += BatchSimulator.CARD_VALUES[cards]
+
+    # Deals the starting hand of every player at the given tables
+    def dealCards(self, tables):
+        for seat in range(self.numPlayers):
+            seated = tables[self.alive[tables, seat]]
+            for i in range(Game.STARTING_HAND_SIZE):
+                self.drawCards(seated, seat)
+
+    # Ante Betting Phase where every player calls the hand pot ante, going
+    # all-in if they can't pay it
+    def doBettingPhase(self, tables):
+        # Skipped if 1 or less players can bet
+        alive = self.alive[tables]
+        chips = self.chips[tables]
+        tables = tables[(alive & (chips > 0)).sum(axis=1) > 1]
+        paid = np.minimum(self.chips[tables], Game.HAND_POT_ANTE) * self.alive[tables]
+        self.chips[tables] -= paid
+        self.handPots[tables] += paid.sum(axis=1, dtype=np.int32)
+
+    # Draw Phase where players Draw until their hand value reaches their stand
+    # value, in cycles until everyone Stands. Each cycle only visits the tables
+    # where someone drew in the last one.
+    def doDrawingPhase(self, tables):
+        drew = np.zeros(self.numTables, dtype=bool)
+        while len(tables) > 0:
+            drew[tables] = False
+            for seat in range(self.numPlayers):
+                acting = tables[self.alive[tables, seat]]
+                wantsToDraw = (np.abs(self.totals[acting, seat]) < self.standValues[seat]) & (self.deckPositions[acting] < Deck.NUM_CARDS)
+                drawing = acting[wantsToDraw]
+                self.drawCards(drawing, seat)
+                drew[drawing] = True
+                self.attemptShift(acting)
+            tables = tables[drew[tables]]
+
+    # Has a SHIFT_CHANCE chance to Shift at each of the given tables
+    def attemptShift(self, tables):
+        shifted = tables[self.rng.random(len(tables)) < Game.SHIFT_CHANCE]
+        if len(shifted) > 0:
+            self.shift(shifted)
+
+    # Shuffles all cards in the hands at the given tables and deals them back
+    # out, so each player keeps the same number of cards
+    def shift(self, tables):
+        self.numShifts += len(tables)
+        numDrawn = self.deckPositions[tables]
+        width = int(numDrawn.max())
+        owners = self.owners[tables, :width]
+
+        # Sorting random keys puts each table's drawn cards first in a random
+        # order, and the owners are moved along with them
+        keys = self.rng.random(owners.shape, dtype=np.float32)
+        keys[owners == BatchSimulator.NO_OWNER] = 2
+        owners = np.take_along_axis(owners, np.argsort(keys, axis=1), axis=1)
+        self.owners[tables, :width] = owners
+        self.totals[tables] = self.getSeatTotals(BatchSimulator.CARD_VALUES[self.decks[tables, :width]], owners)
+
+    # Returns the sum of the card values owned by each seat, given the values
+    # and owners of the cards at some tables
+    def getSeatTotals(self, values, owners):
+        totals = np.empty((len(values), self.numPlayers), dtype=np.int32)
+        for seat in range(self.numPlayers):
+            totals[:, seat] = (values * (owners == seat)).sum(axis=1)
+        return totals
+
+    # Resolves the round at the given tables and pays out the pots
+    def resolveRound(self, tables):
+        # Score every hand like Game.CLASSIFIER
+        totals = np.abs(self.totals[tables])
+        width = int(self.deckPositions[tables].max(initial=0))
+        cardFlags = BatchSimulator.CARD_FLAGS[self.decks[tables, :width]]
+        owners = self.owners[tables, :width]
+        flags = np.empty((len(tables), self.numPlayers), dtype=np.uint8)
+        for seat in range(self.numPlayers):
+            flags[:, seat] = np.bitwise_or.reduce(cardFlags * (owners == seat), axis=1)
+        scores = np.where(totals == Game.SABAAC_VALUE, Game.PURE_SABAAC_VALUE, totals)
+        scores = np.where(flags == BatchSimulator.IDIOTS_ARRAY_FLAGS, Game.IDIOTS_ARRAY_VALUE, scores)
+        scores = np.where(totals > Game.SABAAC_VALUE, -1, scores)
+        scores = np.where(self.alive[tables], scores, -2)
+
+        bestScores = scores.max(axis=1)
+        winners = scores.argmax(axis=1)
+        won = (bestScores >= 0) & ((scores == bestScores[:, None]).sum(axis=1) == 1)
+        wonSabaac = won & (bestScores >= Game.PURE_SABAAC_VALUE)
+        self.numTies += int((~won).sum())
+        self.numSabaacWins += int(wonSabaac.sum())
+
+        # A tie loses the hand pot to the Sabaac pot, and a Sabaac also wins the
+        # Sabaac pot
+        handPots = self.handPots[tables]
+        sabaacPots = self.sabaacPots[tables]
+        self.chips[tables[won], winners[won]] += handPots[won] + sabaacPots[won] * wonSabaac[won]
+        self.sabaacPots[tables] = np.where(wonSabaac, 0, sabaacPots + handPots * ~won)
+        self.handPots[tables] = 0
+
+# Plays Games between ThresholdDeciders, and returns the fraction of rounds
+# that were tied and that were won with a Sabaac
+def getGameRates(numGames, numPlayers, maxRounds, seed = 0):
+    numRounds = 0
+    numTies = 0
+    numSabaacWins = 0
+    rng = random.Random(seed)
+    for i in range(numGames):
+        names = ["Player " + str(j + 1) for j in range(numPlayers)]
+        game = Game(names, deciders=[ThresholdDecider() for name in names], headless=True, rng=random.Random(rng.random()))
+        while len(game.playerList) > 1 and game.roundsPlayed < maxRounds:
+            game.doRound()
+            if len(game.playerList) <= 1:
+                # The game ended in the Sabaac phase, before the round started
+                continue
+            numRounds += 1
+            for eventType in game.actionLog.eventTypes:
+                if eventType == EventLog.TIE or eventType == EventLog.SABAAC_TIE:
+                    numTies += 1
+                elif eventType == EventLog.WON_SABAAC_POT:
+                    numSabaacWins += 1
+    return numTies / numRounds, numSabaacWins / numRounds
+
+def main():
+    numTables = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    numPlayers = 4
+    maxRounds = 20
+    simulator = BatchSimulator(numTables, numPlayers, seed=0)
+    start = time.perf_counter()
+    simulator.playGame(maxRounds)
+    seconds = time.perf_counter() - start
+    print("Played", simulator.numRounds, "rounds at", numTables, "tables in", round(seconds, 2), "seconds",
+          "(" + format(simulator.numRounds / seconds * 60, ",.0f") + " rounds per minute)")
+
+    # Compare with Games played one at a time
+    print("Batched: ties", format(simulator.numTies / simulator.numRounds, ".2%"),
+          "Sabaac wins", format(simulator.numSabaacWins / simulator.numRounds, ".2%"))
+    tieRate, sabaacRate = getGameRates(500, numPlayers, maxRounds)
+    print("Game:    ties", format(tieRate, ".2%"), "Sabaac wins", format(sabaacRate, ".2%"))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+from decider import RandomDecider, ThresholdDecider
+from deck import Deck
+from game import Game
+from player import Player
+from recorder import GameRecording, Recorder, ReplayDecider
+import argparse
+import copy
+import json
+import platform
+import random
+import sys
+import timeit
+
+"""
+Benchmark suite for the engine's hot paths. Every benchmark uses fixed seeds
+and scripted choices (replayed with a ReplayDecider), so each run does exactly
+the same work. Results are written as JSON and can be compared against a
+stored baseline to catch performance regressions:
+
+    python benchmark.py --output results.json --baseline benchmark_baseline.json
+    python benchmark.py --save-baseline benchmark_baseline.json
+"""
+
+BENCHMARKS = []     # (name, setup function) pairs, in the order they run
+
+# Registers a benchmark. The decorated function sets up the benchmark and
+# returns the function to time.
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+# Returns a headless game with the given number of players, partway through
+# a round (cards dealt)
+def createDealtGame(numPlayers, seed = 0):
+    rng = random.Random(seed)
+    names = ["Player " + str(i + 1) for i in range(numPlayers)]
+    game = Game(names, deciders=[RandomDecider(random.Random(rng.random())) for name in names], headless=True, rng=rng)
+    game.resetRound()
+    game.dealCards()
+    return game
+
+# Returns a recording of a game between ThresholdDeciders that plays all
+# maxRounds rounds. They always call, so with enough starting chips nobody is
+# knocked out early (RandomDeciders go all-in, and their games end after a
+# handful of rounds).
+def recordGame(numPlayers, maxRounds, seed = 0, startingChips = 100):
+    names = ["Player " + str(i + 1) for i in range(numPlayers)]
+    deciders = [ThresholdDecider() for name in names]
+    game, recording = Recorder.createGame(names, deciders, startingChips, seed=seed, headless=True)
+    game.playGame(maxRounds)
+    if game.roundsPlayed != maxRounds:
+        raise ValueError("Recorded game ended after " + str(game.roundsPlayed) + " of " + str(maxRounds) + " rounds")
+    return recording
+
+@benchmark("Deck.createDeck")
+def benchmarkCreateDeck():
+    rng = random.Random(0)
+    return lambda: Deck.createDeck(rng)
+
+@benchmark("Deck.draw (whole deck)")
+def benchmarkDraw():
+    deck = Deck.createDeck(random.Random(0))
+    deckList = deck.getDeckList()[:]
+    def drawAll():
+        deck.deckList = deckList[:]
+        for i in range(Deck.NUM_CARDS):
+            deck.draw()
+    return drawAll
+
+@benchmark("Deck.shuffle")
+def benchmarkShuffle():
+    deck = Deck.createDeck(random.Random(0))
+    return deck.shuffle
+
+@benchmark("Deck.insertRandomly")
+def benchmarkInsertRandomly():
+    deck = Deck.createDeck(random.Random(0))
+    card = deck.draw()
+    def insertAndDraw():
+        deck.insertRandomly(card)
+        deck.draw()
+    return insertAndDraw
+
+@benchmark("Player.calculateHandValue")
+def benchmarkCalculateHandValue():
+    player = Player("Player", RandomDecider())
+    for cardId in (0, 14, 47, 60, 75):
+        player.addToHand(Deck.getCard(cardId))
+    return player.calculateHandValue
+
+@benchmark("Game.shift (8 players)")
+def benchmarkShift():
+    game = createDealtGame(8)
+    def shift():
+        # Clear the last Shift's event, so the log doesn't grow while timing
+        game.actionLog.clear()
+        game.shift()
+    return shift
+
+@benchmark("Game.isIdiotsArray")
+def benchmarkIsIdiotsArray():
+    game = createDealtGame(2)
+    hand = [Deck.getCard(74), Deck.getCard(1)]     # The Idiot, 2 of Coins
+    interferenceField = [Deck.getCard(2)]           # 3 of Coins
+    return lambda: game.isIdiotsArray(hand, interferenceField)
+
+@benchmark("Game.resolveRound (8 players)")
+def benchmarkResolveRound():
+    game = createDealtGame(8)
+    handPot = game.handPot
+    sabaacPot = game.sabaacPot
+    def resolveRound():
+        # Take back what the last call paid out, so every call starts the same
+        for player in game.playerList:
+            player.chips = 30
+        game.handPot = handPot
+        game.sabaacPot = sabaacPot
+        game.resolveRound()
+    return resolveRound
+
+# Registers a benchmark of a betting phase where every player raises
+def addBettingPhaseBenchmark(numPlayers):
+    @benchmark("Game.doBettingPhase (" + str(numPlayers) + " players, " + str(numPlayers) + " raises)")
+    def benchmarkBettingPhase():
+        game = createDealtGame(numPlayers)
+
+        # Every player raises by 1 in turn, then everyone but the last raiser calls
+        recording = GameRecording(0, [player.getName() for player in game.playerList], 30)
+        for i in range(numPlayers):
+            recording.decisions.extend((3, 1))
+        recording.decisions.extend([2] * (numPlayers - 1))
+        replayDecider = ReplayDecider(recording)
+        for player in game.playerList:
+            player.decider = replayDecider
+
+        def bettingPhase():
+            for player in game.playerList:
+                player.chips = 30
+            game.currentPlayers = game.playerList[:]
+            game.handPot = 0
+            replayDecider.position = 0
+            game.doBettingPhase(True)
+        return bettingPhase
+
+for numPlayers in (8, 20):
+    addBettingPhaseBenchmark(numPlayers)
+
+@benchmark("Game.clone (8 players)")
+def benchmarkClone():
+    game = createDealtGame(8)
+    rng = random.Random(1)
+    return lambda: game.clone(rng=rng)
+
+@benchmark("copy.deepcopy(Game) (8 players)")
+def benchmarkDeepcopy():
+    game = createDealtGame(8)
+    # The renderer holds the output stream, which can't be deep-copied
+    return lambda: copy.deepcopy(game, { id(game.renderer): game.renderer })
+
+# Registers a benchmark that replays a whole recorded game
+def addPlayGameBenchmark(numPlayers, maxRounds):
+    @benchmark("Game.playGame (" + str(numPlayers) + " players, " + str(maxRounds) + " rounds)")
+    def benchmarkPlayGame():
+        recording = recordGame(numPlayers, maxRounds)
+        return lambda: Recorder.replayGame(recording).playGame(maxRounds)
+
+for numPlayers in (2, 8, 20):
+    addPlayGameBenchmark(numPlayers, 20)
+addPlayGameBenchmark(200, 5)     # Exhibition table dealt from 10 decks
+
+# Times the function and returns the best time per call in seconds, out of
+# the given number of repeats
+def timeFunction(function, repeat = 5):
+    timer = timeit.Timer(function)
+    number, totalTime = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+# Runs the benchmarks whose names contain nameFilter, and returns the results
+# as a dictionary that can be written as JSON
+def runBenchmarks(nameFilter = "", repeat = 5, verbose = True):
+    results = {}
+    for name, setup in BENCHMARKS:
+        if nameFilter not in name:
+            continue
+        seconds = timeFunction(setup(), repeat)
+        results[name] = { "seconds": seconds, "perSecond": 1 / seconds }
+        if verbose:
+            print(format(name, "48"), format(seconds * 1e6, "12.2f"), "us", format(1 / seconds, "14.0f"), "/s")
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+# Times the benchmarks with the given names again, up to retries more times,
+# keeping each one's best time. Used to tell real regressions from noise: a
+# benchmark only counts as slower if none of its runs are within the
+# tolerance of the baseline.
+def retryRegressions(names, results, baseline, tolerance, repeat = 5, retries = 2):
+    for name, setup in BENCHMARKS:
+        if name not in names:
+            continue
+        result = results["results"][name]
+        baselineSeconds = baseline["results"][name]["seconds"]
+        for i in range(retries):
+            if result["seconds"] <= baselineSeconds * (1 + tolerance):
+                break
+            seconds = min(result["seconds"], timeFunction(setup(), repeat))
+            result["seconds"] = seconds
+            result["perSecond"] = 1 / seconds
+
+# Compares results against a baseline and returns the names of benchmarks that
+# got slower by more than the tolerance (0.2 = 20% slower)
+def compareResults(results, baseline, tolerance, verbose = True):
+    regressions = []
+    if verbose:
+        print()
+        print("Compared to baseline:")
+    for name, result in results["results"].items():
+        if name not in baseline["results"]:
+            if verbose:
+                print(format(name, "48"), "  (not in baseline)")
+            continue
+        ratio = result["seconds"] / baseline["results"][name]["seconds"]
+        status = ""
+        if ratio > 1 + tolerance:
+            status = "  REGRESSION"
+            regressions.append(name)
+        if verbose:
+            print(format(name, "48"), format(ratio, "7.2f") + "x time" + status)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the Sabaac engine's hot paths.")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose names contain this text")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per benchmark (the best one is kept)")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against results saved in this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="fraction slower than the baseline that counts as a regression")
+    parser.add_argument("--retries", type=int, default=2, help="times to re-run a benchmark that looks slower before reporting it")
+    parser.add_argument("--save-baseline", help="save the results as the new baseline in this JSON file")
+    args = parser.parse_args()
+
+    results = runBenchmarks(args.filter, args.repeat)
+    baseline = None
+    if args.baseline != None:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        # Re-run anything that looks slower, in case it was noise
+        suspects = compareResults(results, baseline, args.tolerance, verbose=False)
+        retryRegressions(suspects, results, baseline, args.tolerance, args.repeat, args.retries)
+
+    for path in (args.output, args.save_baseline):
+        if path != None:
+            with open(path, "w") as file:
+                json.dump(results, file, indent=2)
+
+    if baseline != None:
+        regressions = compareResults(results, baseline, args.tolerance)
+        if len(regressions) > 0:
+            print(len(regressions), "benchmark(s) regressed by more than", format(args.tolerance, ".0%"))
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+from array import array
+from player import Player
+
+"""
+BettingRound class that holds the state of a betting phase as a state machine
+over seats, where seat i is the i-th player still in the round when betting
+started. Every action (fold, call, raise, or skipping a broke player) takes
+constant time:
+
+* An action pointer (seat) moves around a circular linked list of the seats
+  that haven't folded, so folded seats are never visited again.
+* turnsLeft counts the turns left before everyone has acted since the last
+  raise; a raise resets it to the number of other seats still in.
+* What each seat has paid this phase is kept in an array indexed by seat.
+
+The Game applies the chips, pot and action log changes; the BettingRound only
+tracks whose turn it is and how much each seat owes. It can also be driven
+step by step without a Game (see main()).
+"""
+class BettingRound:
+    # Constructor with the players in seat order and the amount each player
+    # must pay to stay in
+    def __init__(self, players, minCost):
+        numSeats = len(players)
+        self.players = list(players)
+        self.minCost = minCost
+        self.paid = array("i", bytes(4 * numSeats))     # Amount each seat has paid this phase
+        self.folded = bytearray(numSeats)
+        self.nextSeat = array("i", [(seat + 1) % numSeats for seat in range(numSeats)])
+        self.previousSeat = array("i", [(seat - 1) % numSeats for seat in range(numSeats)])
+        self.numActive = numSeats   # Seats that haven't folded
+        self.seat = 0               # Seat whose turn it is
+        self.turnsLeft = numSeats   # Turns left until everyone has acted since the last raise
+        self.numRaises = 0
+
+    # Returns a copy of the betting round with the given players (such as
+    # copies of the players) in the same seats
+    def clone(self, players):
+        betting = BettingRound.__new__(BettingRound)
+        betting.players = list(players)
+        betting.minCost = self.minCost
+        betting.paid = array("i", self.paid)
+        betting.folded = bytearray(self.folded)
+        betting.nextSeat = array("i", self.nextSeat)
+        betting.previousSeat = array("i", self.previousSeat)
+        betting.numActive = self.numActive
+        betting.seat = self.seat
+        betting.turnsLeft = self.turnsLeft
+        betting.numRaises = self.numRaises
+        return betting
+
+    # Returns a betting round with the given players in seat order, partway
+    # through: what each seat has paid, which seats have folded, whose turn it
+    # is and the other counters (used to restore a saved game)
+    @staticmethod
+    def fromState(players, minCost, paid, folded, seat, turnsLeft, numRaises):
+        betting = BettingRound(players, minCost)
+        betting.paid = array("i", paid)
+        betting.folded = bytearray(folded)
+        betting.seat = seat
+        betting.turnsLeft = turnsLeft
+        betting.numRaises = numRaises
+
+        # Link the seats that haven't folded in a circle
+        activeSeats = [activeSeat for activeSeat in range(len(players)) if not folded[activeSeat]]
+        betting.numActive = len(activeSeats)
+        for i in range(len(activeSeats)):
+            betting.nextSeat[activeSeats[i]] = activeSeats[(i + 1) % len(activeSeats)]
+            betting.previousSeat[activeSeats[i]] = activeSeats[i - 1]
+        return betting
+
+    # Returns True if betting is over: everyone has acted since the last raise,
+    # or only one player hasn't folded
+    def isOver(self):
+        return self.turnsLeft <= 0 or self.numActive <= 1
+
+    # Returns the player whose turn it is
+    def getPlayer(self):
+        return self.players[self.seat]
+
+    # Returns the amount the player whose turn it is must pay to stay in
+    def getAmountNeeded(self):
+        return self.minCost - self.paid[self.seat]
+
+    # Returns the amount the given player has paid this phase
+    def getPaid(self, seat):
+        return self.paid[seat]
+
+    # Returns the actions the player whose turn it is can take
+    def getActions(self):
+        amountNeeded = self.getAmountNeeded()
+        chips = self.getPlayer().getChips()
+        actions = [ "Fold", "Call" ]
+
+        if self.minCost == 0:
+            # Turn "Call" into "Check" since there is no cost
+            actions[1] = "Check"
+        elif amountNeeded >= chips:
+            # Turn "Call" into "All-in"
+            actions[1] = "All-in"
+
+        # If player has more chips than the current amount, allow them
+        # to Raise as well
+        if amountNeeded < chips:
+            actions.append("Raise")
+        return actions
+
+    # Passes the turn to the next seat that hasn't folded
+    def advance(self):
+        self.seat = self.nextSeat[self.seat]
+        self.turnsLeft -= 1
+
+    # Skips the turn of the player whose turn it is (used for broke players)
+    def skip(self):
+        self.advance()
+
+    # The player whose turn it is folds
+    def fold(self):
+        seat = self.seat
+        self.advance()
+        self.folded[seat] = 1
+        self.numActive -= 1
+
+        # Unlink the seat so it's never visited again
+        self.nextSeat[self.previousSeat[seat]] = self.nextSeat[seat]
+        self.previousSeat[self.nextSeat[seat]] = self.previousSeat[seat]
+
+    # The player whose turn it is calls (or checks, or goes all-in if they
+    # can't pay the full amount). Returns the amount they must pay.
+    def call(self):
+        amount = min(self.getAmountNeeded(), self.getPlayer().getChips())
+        self.paid[self.seat] += amount
+        self.advance()
+        return amount
+
+    # The player whose turn it is raises the amount needed to stay in by the
+    # given amount. Returns the amount they must pay, which is what they owed
+    # plus the raise.
+    def raiseBy(self, amountToRaise):
+        amount = self.getAmountNeeded() + amountToRaise
+        self.paid[self.seat] += amount
+        self.minCost += amountToRaise
+        self.numRaises += 1
+
+        # Every other player still in must call or raise again
+        self.turnsLeft = self.numActive
+        self.advance()
+        return amount
+
+def main():
+    players = [Player("Han"), Player("Lando"), Player("Chewie")]
+    for player in players:
+        player.changeChips(30)
+
+    # Han raises, Lando re-raises, Chewie folds and Han calls
+    betting = BettingRound(players, 2)
+    script = iter([("Raise", 3), ("Raise", 2), ("Fold", 0), ("Call", 0)])
+    while not betting.isOver():
+        player = betting.getPlayer()
+        action, amount = next(script)
+        print(player.getName(), "can", "/".join(betting.getActions()), "and chooses to", action)
+        if action == "Fold":
+            betting.fold()
+        elif action == "Raise":
+            player.changeChips(-betting.raiseBy(amount))
+        else:
+            player.changeChips(-betting.call())
+    print("Chips left:", ", ".join(player.getName() + " " + str(player.getChips()) for player in players))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,494 @@
+from decider import Decider, ThresholdDecider
+from drawpolicy import DrawPolicySolver
+from game import Game
+import mmap
+import numpy as np
+import os
+import random
+import struct
+import sys
+import time
+
+"""
+BettingNode class that holds one point in the abstract betting game solved by
+BettingPolicySolver. Every number in it is an array with one entry per
+starting configuration (phase, pot size and stack size), since the shape of
+the game is the same in each of them.
+
+Decision nodes have the player to act (0 or 1), the key of their information
+set, which actions are legal and the node each action leads to. Terminal nodes
+have no actor, and hold the final pot, what each player paid and who folded
+(None for a showdown).
+"""
+class BettingNode:
+    # Constructor with the pot and what each player has paid this phase
+    def __init__(self, pot, paid):
+        self.pot = pot
+        self.paid = paid
+        self.actor = None
+        self.key = None
+        self.legal = None
+        self.children = None
+        self.folder = None
+
+"""
+BettingPolicySolver class that solves the Betting Phases offline using
+counterfactual regret minimization (CFR+), for two players. The real game is
+abstracted down to:
+
+* A hand strength bucket for each player: hands are split into numBuckets
+  buckets by how they rank against other hands (see rankHands), and each
+  bucket wins a share of the pot against each other bucket
+* The pot size and each player's chips when the phase starts, rounded down to
+  one of potSizes and stackSizes
+* Fold, Call and Raise, where a raise is raiseFraction of the pot (at least
+  minRaise chips), and at most maxRaises raises are made per phase
+
+Players only know their own bucket, how many raises have been made and
+whether they acted first. Every configuration and hand bucket is solved at
+once with NumPy, so each iteration walks the small betting tree a single time
+per player. Long solves can save checkpoints and resume from them.
+"""
+class BettingPolicySolver:
+    POT_SIZES = (0, 2, 4, 8, 16, 32, 64)
+    STACK_SIZES = (2, 5, 10, 20, 40, 80)
+    NUM_ACTIONS = 3     # Fold, Call, Raise
+
+    # Constructor with the number of hand strength buckets, the most raises per
+    # phase, the size of a raise as a fraction of the pot, the smallest raise,
+    # the pot and stack sizes to solve for, and the DrawPolicySolver used to
+    # rank hands (one with default settings if None)
+    def __init__(self, numBuckets = 10, maxRaises = 3, raiseFraction = 0.5, minRaise = 2,
+                 potSizes = POT_SIZES, stackSizes = STACK_SIZES, drawSolver = None):
+        self.numBuckets = numBuckets
+        self.maxRaises = maxRaises
+        self.raiseFraction = raiseFraction
+        self.minRaise = minRaise
+        self.potSizes = tuple(potSizes)
+        self.stackSizes = tuple(stackSizes)
+        self.rankHands(drawSolver if drawSolver != None else DrawPolicySolver())
+
+        # Every starting configuration, ordered by [phase][pot size][stack size]
+        phases, pots, stacks = np.meshgrid(np.arange(2), potSizes, stackSizes, indexing="ij")
+        phases = phases.ravel()
+        self.antes = np.where(phases == 0, Game.HAND_POT_ANTE, 0).astype(np.float64)
+        self.pots = pots.ravel().astype(np.float64)
+        self.stacks = stacks.ravel().astype(np.float64)
+        self.priors = self.phasePriors[phases]
+        self.equities = self.phaseEquities[phases]
+        self.numConfigs = len(self.pots)
+
+        self.numKeys = 2 * (maxRaises + 1)
+        zeros = np.zeros(self.numConfigs)
+        self.root = self.buildNode([zeros, zeros], self.antes, 0, 0, 2)
+
+        shape = (self.numKeys, self.numConfigs, numBuckets, BettingPolicySolver.NUM_ACTIONS)
+        self.regrets = np.zeros(shape)
+        self.strategySums = np.zeros(shape)
+        self.iteration = 0
+
+    # Returns the bucket of each hand strength (between 0 and 1)
+    def getBuckets(self, strengths):
+        return np.minimum((strengths.astype(np.float64) * self.numBuckets).astype(int), self.numBuckets - 1)
+
+    # Returns how each outcome ranks (the chance of a random outcome being
+    # lower, counting ties as half), given the chance and value of each
+    @staticmethod
+    def getStrengths(chances, values):
+        chances = chances / chances.sum()
+        strengths = np.zeros(len(values), dtype=np.float32)
+        for index, value in enumerate(values):
+            strengths[index] = chances[values < value].sum() + chances[values == value].sum() / 2
+        return strengths
+
+    # Works out each phase's hand strengths, the chance of being dealt into
+    # each bucket, and the share of the pot each bucket wins against each other
+    # bucket. The Ante Betting Phase ranks the dealt hand by its chance of
+    # winning once the Draw Phase is played (from the DrawPolicySolver), where
+    # stronger hands are only more likely to win. The Final Betting Phase ranks
+    # the hand's score against final hands, where only a last Shift can upset
+    # the stronger hand.
+    def rankHands(self, drawSolver):
+        values, draws, shiftedValues = drawSolver.solve()
+        self.phasePriors = np.zeros((2, self.numBuckets))
+        self.phaseEquities = np.zeros((2, self.numBuckets, self.numBuckets))
+
+        # Ante Betting Phase: dealt hand totals
+        totals = np.arange(BettingPolicy.MIN_DEALT_TOTAL, BettingPolicy.MIN_DEALT_TOTAL + BettingPolicy.NUM_DEALT_TOTALS)
+        indices = np.clip(totals - drawSolver.minHandTotal, 0, drawSolver.numHandTotals - 1)
+        dealtChances = drawSolver.shiftSums[Game.STARTING_HAND_SIZE][indices]
+        winChances = values[Game.STARTING_HAND_SIZE, -drawSolver.minFieldTotal][indices]
+        dealtStrengths = BettingPolicySolver.getStrengths(dealtChances, winChances)
+        buckets = self.getBuckets(dealtStrengths)
+        np.add.at(self.phasePriors[0], buckets, dealtChances)
+        bucketWins = np.zeros(self.numBuckets)
+        np.add.at(bucketWins, buckets, dealtChances * winChances)
+        winChance = np.clip(bucketWins / np.maximum(self.phasePriors[0], 1e-12), 0.01, 0.99)
+        winning = winChance[:, None] * (1 - winChance[None, :])
+        self.phaseEquities[0] = winning / (winning + winning.T)
+
+        # Final Betting Phase: scores of final hands, indexed by score + 1
+        finalChances = drawSolver.getFinalScores(draws)
+        scores = np.arange(-1, Game.SABAAC_VALUE + 1)
+        finalStrengths = BettingPolicySolver.getStrengths(finalChances, scores)
+        buckets = self.getBuckets(finalStrengths)
+        np.add.at(self.phasePriors[1], buckets, finalChances)
+        scoreChances = np.zeros((self.numBuckets, len(scores)))
+        scoreChances[buckets, np.arange(len(scores))] = finalChances
+        scoreChances /= np.maximum(scoreChances.sum(axis=1, keepdims=True), 1e-12)
+        beats = (scores[:, None] > scores[None, :]) + 0.5 * (scores[:, None] == scores[None, :])
+        keepChance = 1 - Game.SHIFT_CHANCE
+        self.phaseEquities[1] = keepChance * (scoreChances @ beats @ scoreChances.T) + (1 - keepChance) / 2
+
+        self.phasePriors /= self.phasePriors.sum(axis=1, keepdims=True)
+        self.strengths = (dealtStrengths, finalStrengths)
+        self.sabaacChance = finalChances[-1] / finalChances.sum()
+
+    # Returns the key of the information set of the player in the given
+    # position (0 if they act first) after the given number of raises
+    def getKey(self, position, numRaises):
+        return position * (self.maxRaises + 1) + numRaises
+
+    # Builds the betting tree from a point where the players have paid the
+    # given amounts, the actor must pay minCost in total to stay in, and
+    # turnsLeft turns are left before everyone has acted since the last raise
+    def buildNode(self, paid, minCost, numRaises, actor, turnsLeft):
+        node = BettingNode(self.pots + paid[0] + paid[1], paid)
+        if turnsLeft == 0:
+            return node
+
+        chips = self.stacks - paid[actor]
+        amountNeeded = np.maximum(minCost - paid[actor], 0)
+        node.actor = actor
+        node.key = self.getKey(actor, numRaises)
+        node.legal = np.zeros((self.numConfigs, BettingPolicySolver.NUM_ACTIONS), dtype=bool)
+        node.legal[:, 0] = amountNeeded > 0
+        node.legal[:, 1] = True
+        node.legal[:, 2] = (numRaises < self.maxRaises) & (chips > amountNeeded)
+        node.children = [None] * BettingPolicySolver.NUM_ACTIONS
+
+        if node.legal[:, 0].any():
+            node.children[0] = BettingNode(node.pot, paid)
+            node.children[0].folder = actor
+
+        # Call (or go all-in if the player can't pay the full amount)
+        called = list(paid)
+        called[actor] = paid[actor] + np.minimum(amountNeeded, chips)
+        node.children[1] = self.buildNode(called, minCost, numRaises, 1 - actor, turnsLeft - 1)
+
+        if node.legal[:, 2].any():
+            amountToRaise = np.maximum(np.rint(node.pot * self.raiseFraction), self.minRaise)
+            amountToRaise = np.maximum(np.minimum(amountToRaise, chips - amountNeeded), 0)
+            raised = list(paid)
+            raised[actor] = paid[actor] + amountNeeded + amountToRaise
+            node.children[2] = self.buildNode(raised, minCost + amountToRaise, numRaises + 1, 1 - actor, 1)
+        return node
+
+    # Returns the current strategy at a decision node by regret matching,
+    # indexed by [configuration, bucket, action]
+    def getStrategy(self, node):
+        positive = self.regrets[node.key] * node.legal[:, None, :]
+        total = positive.sum(axis=2, keepdims=True)
+        uniform = node.legal / node.legal.sum(axis=1, keepdims=True)
+        return np.where(total > 0, positive / np.where(total > 0, total, 1), uniform[:, None, :])
+
+    # Returns the counterfactual value of the node for the given player,
+    # indexed by [configuration, bucket], where ownReach and opponentReach are
+    # the chances of each player playing to this node with each bucket. Updates
+    # the player's regrets and average strategy on the way.
+    def traverse(self, node, player, ownReach, opponentReach):
+        if node.actor == None:
+            opponentReach = opponentReach * self.priors
+            opponentTotal = opponentReach.sum(axis=1, keepdims=True)
+            paid = node.paid[player][:, None]
+            if node.folder == None:
+                won = np.einsum("cj,cij->ci", opponentReach, self.equities)
+                return node.pot[:, None] * won - paid * opponentTotal
+            if node.folder == player:
+                return -paid * opponentTotal
+            return (node.pot[:, None] - paid) * opponentTotal
+
+        strategy = self.getStrategy(node)
+        if node.actor != player:
+            value = 0
+            for action, child in enumerate(node.children):
+                if child != None:
+                    value = value + self.traverse(child, player, ownReach, opponentReach * strategy[:, :, action])
+            return value
+
+        actionValues = np.zeros(strategy.shape)
+        for action, child in enumerate(node.children):
+            if child != None:
+                actionValues[:, :, action] = self.traverse(child, player, ownReach * strategy[:, :, action], opponentReach)
+        value = (strategy * actionValues).sum(axis=2)
+
+        # CFR+ keeps regrets from going below zero, and weights later
+        # iterations more in the average strategy
+        regrets = self.regrets[node.key] + (actionValues - value[:, :, None]) * node.legal[:, None, :]
+        self.regrets[node.key] = np.maximum(regrets, 0)
+        self.strategySums[node.key] += self.iteration * ownReach[:, :, None] * strategy
+        return value
+
+    # Runs one iteration, updating each player's regrets in turn
+    def iterate(self):
+        self.iteration += 1
+        reach = np.ones((self.numConfigs, self.numBuckets))
+        for player in range(2):
+            self.traverse(self.root, player, reach, reach)
+
+    # Returns the average strategy, which is what converges, indexed by
+    # [key, configuration, bucket, action]
+    def getAverageStrategy(self):
+        total = self.strategySums.sum(axis=3, keepdims=True)
+        callOnly = np.zeros(BettingPolicySolver.NUM_ACTIONS)
+        callOnly[1] = 1
+        return np.where(total > 0, self.strategySums / np.where(total > 0, total, 1), callOnly)
+
+    # Saves the solver's progress, replacing the file only once it's written
+    def saveCheckpoint(self, path):
+        settings = np.array([self.numBuckets, self.maxRaises, self.raiseFraction, self.minRaise])
+        temporaryPath = path + ".tmp"
+        with open(temporaryPath, "wb") as file:
+            np.savez(file, settings=settings, potSizes=self.potSizes, stackSizes=self.stackSizes, strengths=np.concatenate(self.strengths),
+                     regrets=self.regrets, strategySums=self.strategySums, iteration=self.iteration)
+        os.replace(temporaryPath, path)
+
+    # Continues from progress saved by saveCheckpoint. The hand strengths must
+    # match too, since buckets ranked differently make a different game.
+    def loadCheckpoint(self, path):
+        with np.load(path) as checkpoint:
+            settings = np.array([self.numBuckets, self.maxRaises, self.raiseFraction, self.minRaise])
+            if not np.array_equal(checkpoint["settings"], settings) or tuple(checkpoint["potSizes"]) != self.potSizes \
+                    or tuple(checkpoint["stackSizes"]) != self.stackSizes:
+                raise ValueError("Checkpoint " + path + " was saved by a solver with different settings")
+            if "strengths" not in checkpoint or not np.allclose(checkpoint["strengths"], np.concatenate(self.strengths)):
+                raise ValueError("Checkpoint " + path + " was saved by a solver with different hand strengths")
+            self.regrets = checkpoint["regrets"]
+            self.strategySums = checkpoint["strategySums"]
+            self.iteration = int(checkpoint["iteration"])
+
+    # Runs iterations until the given total has been run. With a checkpoint
+    # path, progress is loaded from it if it exists and saved to it every
+    # checkpointInterval iterations.
+    def solve(self, iterations, checkpointPath = None, checkpointInterval = 100, verbose = False):
+        if checkpointPath != None and os.path.exists(checkpointPath):
+            self.loadCheckpoint(checkpointPath)
+            if verbose:
+                print("Resuming from iteration", self.iteration)
+        start = time.perf_counter()
+        while self.iteration < iterations:
+            self.iterate()
+            if self.iteration % checkpointInterval == 0 or self.iteration == iterations:
+                if checkpointPath != None:
+                    self.saveCheckpoint(checkpointPath)
+                if verbose:
+                    print("Iteration", self.iteration, "after", round(time.perf_counter() - start, 1), "seconds")
+
+    # Saves the average strategy to a file (see BettingPolicy), along with the
+    # hand strengths used to pick buckets and the chance of a Pure Sabaac
+    def save(self, path):
+        # Reorder to [phase][pot size][stack size][key][bucket][action]
+        numPots = len(self.potSizes)
+        numStacks = len(self.stackSizes)
+        strategy = self.getAverageStrategy().reshape(self.numKeys, 2, numPots, numStacks, self.numBuckets, BettingPolicySolver.NUM_ACTIONS)
+        strategy = strategy.transpose(1, 2, 3, 0, 4, 5)
+
+        header = BettingPolicy.HEADER.pack(BettingPolicy.MAGIC, BettingPolicy.VERSION, numPots, numStacks, self.maxRaises,
+                                           self.numBuckets, round(100 * self.raiseFraction), self.minRaise)
+        with open(path, "wb") as file:
+            file.write(header)
+            file.write(np.array(self.potSizes + self.stackSizes, dtype="<u2").tobytes())
+            file.write(np.concatenate(self.strengths + ([self.sabaacChance],)).astype("<f4").tobytes())
+            file.write(np.rint(255 * strategy).astype(np.uint8).tobytes())
+
+"""
+BettingPolicy class that looks up betting strategies in a table written by
+BettingPolicySolver. Like DrawPolicy, the file is memory-mapped, and every
+lookup takes constant time. All numbers are little-endian:
+
+* Header: magic "SBBP", version, number of pot sizes, number of stack sizes,
+  most raises, number of hand strength buckets, raise size as a percentage of
+  the pot, smallest raise (1 byte each)
+* Each pot size, then each stack size (2 bytes each)
+* The strength of each dealt hand total from MIN_DEALT_TOTAL up, then of each
+  final score from -1 (bombed out) to 23, between 0 and 1, and the chance of
+  a final hand being a Pure Sabaac (4 byte floats)
+* The chance of Folding, Calling and Raising for each [phase][pot size][stack
+  size][position][raises][bucket], in 255ths (1 byte each)
+"""
+class BettingPolicy:
+    MAGIC = b"SBBP"
+    VERSION = 1
+    HEADER = struct.Struct("<4sBBBBBBB")
+    MIN_DEALT_TOTAL = -40   # Lowest total of a dealt hand in the table
+    NUM_DEALT_TOTALS = 81
+    NUM_SCORES = Game.SABAAC_VALUE + 2
+
+    # Returns the policy in the given file
+    @staticmethod
+    def load(path):
+        with open(path, "rb") as file:
+            return BettingPolicy(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    # Constructor with the contents of a policy file (any buffer, such as an
+    # mmap or bytes)
+    def __init__(self, data):
+        magic, version, numPots, numStacks, self.maxRaises, self.numBuckets, raisePercent, \
+            self.minRaise = BettingPolicy.HEADER.unpack_from(data)
+        if magic != BettingPolicy.MAGIC:
+            raise ValueError("Not a Sabaac betting policy")
+        if version != BettingPolicy.VERSION:
+            raise ValueError("Unsupported betting policy version " + str(version))
+        self.data = data
+        self.raiseFraction = raisePercent / 100
+
+        view = memoryview(data)
+        offset = BettingPolicy.HEADER.size
+        sizes = np.frombuffer(view[offset:(offset + 2 * (numPots + numStacks))], dtype="<u2").tolist()
+        self.potSizes = sizes[:numPots]
+        self.stackSizes = sizes[numPots:]
+        offset += 2 * (numPots + numStacks)
+        numStrengths = BettingPolicy.NUM_DEALT_TOTALS + BettingPolicy.NUM_SCORES
+        strengths = np.frombuffer(view[offset:(offset + 4 * (numStrengths + 1))], dtype="<f4").tolist()
+        self.dealtStrengths = strengths[:BettingPolicy.NUM_DEALT_TOTALS]
+        self.finalStrengths = strengths[BettingPolicy.NUM_DEALT_TOTALS:numStrengths]
+        self.sabaacChance = strengths[numStrengths]
+        offset += 4 * (numStrengths + 1)
+        self.strategy = view[offset:]
+
+    # Returns the index of the largest size that's at most the given amount
+    @staticmethod
+    def getSizeIndex(sizes, amount):
+        index = 0
+        while index + 1 < len(sizes) and sizes[index + 1] <= amount:
+            index += 1
+        return index
+
+    # Returns the hand strength bucket of a hand total in the given phase
+    # (0 for the Ante Betting Phase, 1 for the Final Betting Phase)
+    def getBucket(self, phaseIndex, handTotal):
+        if phaseIndex == 0:
+            index = min(max(handTotal - BettingPolicy.MIN_DEALT_TOTAL, 0), BettingPolicy.NUM_DEALT_TOTALS - 1)
+            strength = self.dealtStrengths[index]
+        else:
+            handValue = abs(handTotal)
+            strength = self.finalStrengths[handValue + 1 if handValue <= Game.SABAAC_VALUE else 0]
+        return min(int(strength * self.numBuckets), self.numBuckets - 1)
+
+    # Returns the chances of (Fold, Call, Raise), which add up to about 1
+    def getStrategy(self, phaseIndex, startingPot, stack, position, numRaises, bucket):
+        potIndex = BettingPolicy.getSizeIndex(self.potSizes, startingPot)
+        stackIndex = BettingPolicy.getSizeIndex(self.stackSizes, stack)
+        keyIndex = position * (self.maxRaises + 1) + min(numRaises, self.maxRaises)
+        index = (((phaseIndex * len(self.potSizes) + potIndex) * len(self.stackSizes) + stackIndex) * 2 * (self.maxRaises + 1) + keyIndex)
+        index = (index * self.numBuckets + bucket) * 3
+        strategy = self.strategy
+        return (strategy[index] / 255, strategy[index + 1] / 255, strategy[index + 2] / 255)
+
+    # Returns how much to raise by with the given pot, at most max chips
+    def getRaiseAmount(self, pot, max):
+        amount = round(pot * self.raiseFraction)
+        if amount < self.minRaise:
+            amount = self.minRaise
+        return min(amount, max)
+
+"""
+Decider that bets using a BettingPolicy and leaves every other choice to
+another decider (a ThresholdDecider by default, or a PolicyDecider). With more
+than two players it plays as if only the strongest opponent were left: the
+first player to act plays the first position, and everyone else the second.
+"""
+class BettingPolicyDecider(Decider):
+    # Constructor with the BettingPolicy to follow, the decider for every other
+    # choice and an optional random number generator
+    def __init__(self, policy, decider = None, rng = None):
+        self.policy = policy
+        self.decider = decider if decider != None else ThresholdDecider()
+        self.rng = rng if rng != None else random.Random()
+
+    def startTurn(self, game, player):
+        self.decider.startTurn(game, player)
+
+    def endTurn(self, game, player):
+        self.decider.endTurn(game, player)
+
+    # Returns the share of the Sabaac pot expected to be won this round. Only
+    # players still in can win it, so it counts as part of the pot, both when
+    # choosing an action and when sizing a raise.
+    def getSabaacShare(self, game):
+        return game.sabaacPot * min(1, game.betting.numActive * self.policy.sabaacChance)
+
+    def chooseIndex(self, game, player, title, options):
+        if title != Decider.BETTING_MENU or game.betting == None:
+            return self.decider.chooseIndex(game, player, title, options)
+
+        # Work out the phase, pot and chips as they were when the phase began
+        betting = game.betting
+        phaseIndex = 0 if game.phase == Game.ANTE_BETTING_PHASE else 1
+        startingPot = game.handPot - sum(betting.paid) + self.getSabaacShare(game)
+        stack = player.getChips() + betting.getPaid(betting.seat)
+        opponentStack = 0
+        for seat, other in enumerate(betting.players):
+            if other != player and not betting.folded[seat]:
+                opponentStack = max(opponentStack, other.getChips() + betting.getPaid(seat))
+        handTotal = sum(card.getValue() for card in player.getHand()) + sum(card.getValue() for card in player.getInterferenceField())
+        bucket = self.policy.getBucket(phaseIndex, handTotal)
+        position = 0 if betting.seat == 0 else 1
+        strategy = self.policy.getStrategy(phaseIndex, startingPot, min(stack, opponentStack), position, betting.numRaises, bucket)
+
+        # Options are always [Fold, Call/Check/All-in, (Raise)]
+        weights = strategy[:len(options)]
+        choice = self.rng.random() * sum(weights)
+        for index, weight in enumerate(weights):
+            if choice < weight:
+                return index + 1
+            choice -= weight
+        return 2
+
+    def chooseNumber(self, game, player, title, max):
+        if title == Decider.RAISE_MENU and game.betting != None:
+            return self.policy.getRaiseAmount(game.handPot + self.getSabaacShare(game), max)
+        return self.decider.chooseNumber(game, player, title, max)
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else "bettingpolicy.bin"
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    solver = BettingPolicySolver()
+    start = time.perf_counter()
+    solver.solve(iterations, checkpointPath=path + ".checkpoint.npz", verbose=True)
+    solver.save(path)
+    print("Solved and saved", path, "in", round(time.perf_counter() - start, 2), "seconds")
+
+    # Show the Final Betting Phase strategy after the other player raises, for
+    # a few pot sizes. Folding there depends on the hand, so the table should
+    # have the weakest bucket fold more often than not, the strongest bucket
+    # never fold, and a stronger bucket never fold much more often.
+    policy = BettingPolicy.load(path)
+    for startingPot in (2, 8, 32):
+        print("Final Betting Phase facing a raise with a pot of", startingPot, "(Fold/Call/Raise by bucket):")
+        foldChances = []
+        for bucket in range(policy.numBuckets):
+            strategy = policy.getStrategy(1, startingPot, 30, 1, 1, bucket)
+            foldChances.append(strategy[0])
+            print("* Bucket", bucket, "/".join(format(chance, ".2f") for chance in strategy))
+
+        isSensible = foldChances[0] > 0.5 and foldChances[-1] == 0 \
+            and all(foldChances[i + 1] <= foldChances[i] + 0.05 for i in range(len(foldChances) - 1))
+        print("Folds weak hands and not strong ones:", isSensible)
+
+    # Compare the policy with always calling (what ThresholdDecider does, and
+    # what the policy falls back on for every other choice), each playing
+    # ThresholdDeciders for a fixed number of rounds
+    numGames = 200
+    for name, createDecider in (("Policy", lambda i: BettingPolicyDecider(policy, rng=random.Random(i))),
+                                ("Always call", lambda i: ThresholdDecider())):
+        chipDifference = 0
+        for i in range(numGames):
+            game = Game(["Player", "Opponent"], deciders=[createDecider(i), ThresholdDecider()], headless=True, rng=random.Random(i))
+            game.playGame(30)
+            chips = { player.getName(): player.getChips() for player in game.playerList + game.eliminatedPlayers }
+            chipDifference += chips["Player"] - chips["Opponent"]
+        print(name, "won", format(chipDifference / numGames, ".2f"), "chips per game more than ThresholdDecider")
+
+if __name__ == "__main__":
+    main()
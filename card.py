@@ -22,37 +22,43 @@ class Card:
             return "Staves"
         return "None"
     
-    # Constructor with an optional name
-    def __init__(self, suit, value, name = None):
-        self.suit = suit
-        self.value = value
-        self.name = name
+    # Names of the values 12 through 15
+    VALUE_NAMES = { 12: "Commander", 13: "Mistress", 14: "Master", 15: "Ace" }
     
-    # Returns the name of the card
-    def getName(self):
-        # If name is defined, return name
-        if self.name != None:
-            return self.name
-        
+    # Cards are created once and shared (see Deck.CARDS), so they store only
+    # these fields, and their name and display string are built up front
+    __slots__ = ("suit", "value", "name", "cardId", "displayString")
+    
+    # Returns the generated name for a suit card, or None if it has no suit
+    @staticmethod
+    def generateName(suit, value):
         # If suit is undefined, cannot generate
-        if self.suit == None or self.suit == Card.NO_SUIT:
+        if suit == None or suit == Card.NO_SUIT:
             return None
         
         # Attempt to generate name based on value
-        if self.value >= 1 and self.value <= 11:
-            return str(self.value) + " of " + Card.getSuitName(self.suit)
-        
-        if self.value == 12:
-            return "Commander of " + Card.getSuitName(self.suit)
-            
-        if self.value == 13:
-            return "Mistress of " + Card.getSuitName(self.suit)
+        if value >= 1 and value <= 11:
+            return str(value) + " of " + Card.getSuitName(suit)
         
-        if self.value == 14:
-            return "Master of " + Card.getSuitName(self.suit)
+        if value in Card.VALUE_NAMES:
+            return Card.VALUE_NAMES[value] + " of " + Card.getSuitName(suit)
         
-        if self.value == 15:
-            return "Ace of " + Card.getSuitName(self.suit)
+        return None
+    
+    # Constructor with an optional name and id (the card's index in the deck's
+    # card table)
+    def __init__(self, suit, value, name = None, cardId = None):
+        if name == None:
+            name = Card.generateName(suit, value)
+        self.suit = suit
+        self.value = value
+        self.name = name
+        self.cardId = cardId
+        self.displayString = str(name) + " (" + str(value) + ")"
+    
+    # Returns the name of the card
+    def getName(self):
+        return self.name
     
     # Returns the numerical id of this card's suit
     def getSuitIndex(self):
@@ -62,9 +68,13 @@ class Card:
     def getValue(self):
         return self.value
     
+    # Returns the id of the card, or None if it is not part of a card table
+    def getId(self):
+        return self.cardId
+    
     # Allows Card objects to be printed as strings
     def __str__(self):
-        return self.getName() + " (" + str(self.getValue()) + ")"
+        return self.displayString
 
 def main():
     max = 15
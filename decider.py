@@ -0,0 +1,212 @@
+from renderer import TerminalRenderer
+import random
+
+"""
+Decision class that describes something a Game needs from a player. A Game's
+phases yield Decisions, and whoever is running the game answers them, usually
+by asking the player's Decider (see Decider.answer).
+"""
+class Decision:
+    # Kinds of decisions
+    START_TURN = 0  # The player's turn is starting, no answer needed
+    END_TURN = 1    # The player finished an action in the Draw Phase, no answer needed
+    CHOOSE = 2      # Choose one of the options, answered with its index (indexed at 1)
+    NUMBER = 3      # Choose a number, answered with a number between [1, max]
+
+    # Constructor with the kind of decision, the player it's for, and the
+    # title and options (for CHOOSE) or maximum (for NUMBER)
+    def __init__(self, kind, player, title = None, options = None, max = None):
+        self.kind = kind
+        self.player = player
+        self.title = title
+        self.options = options
+        self.max = max
+
+    # Returns a Decision where the player chooses from the options
+    @staticmethod
+    def choose(player, title, options):
+        return Decision(Decision.CHOOSE, player, title, options)
+
+    # Returns a Decision where the player chooses a number between [1, max]
+    @staticmethod
+    def number(player, title, max):
+        return Decision(Decision.NUMBER, player, title, max=max)
+
+    # Returns a Decision telling the player their turn is starting
+    @staticmethod
+    def startTurn(player):
+        return Decision(Decision.START_TURN, player)
+
+    # Returns a Decision telling the player their action is done
+    @staticmethod
+    def endTurn(player):
+        return Decision(Decision.END_TURN, player)
+
+"""
+Decider classes that make choices on behalf of a player. Every choice a Game
+needs from a player (betting, drawing, picking cards, playing again) goes
+through the player's Decider, so players can be humans at the keyboard or bots.
+"""
+class Decider:
+    # Menu titles, used by deciders to know which choice is being asked for
+    BETTING_MENU = "BETTING PHASE"
+    RAISE_MENU = "Input number of chips to raise by."
+    DRAW_MENU = "DRAW PHASE"
+    HAND_CARD_MENU = "Choose Card from Hand"
+    IF_CARD_MENU = "Choose Card from Interference Field"
+    PLAY_AGAIN_MENU = "PLAY AGAIN?"
+
+    # Returns the answer to a Decision from the given game
+    def answer(self, game, decision):
+        if decision.kind == Decision.CHOOSE:
+            return self.chooseIndex(game, decision.player, decision.title, decision.options)
+        if decision.kind == Decision.NUMBER:
+            return self.chooseNumber(game, decision.player, decision.title, decision.max)
+        if decision.kind == Decision.START_TURN:
+            self.startTurn(game, decision.player)
+        elif decision.kind == Decision.END_TURN:
+            self.endTurn(game, decision.player)
+        return None
+
+    # Called when it becomes the player's turn to make a choice
+    def startTurn(self, game, player):
+        pass
+
+    # Called after the player takes an action in the Draw Phase
+    def endTurn(self, game, player):
+        pass
+
+    # Returns the index of the chosen option, indexed at 1
+    def chooseIndex(self, game, player, title, options):
+        raise NotImplementedError
+
+    # Returns a number between [1, max]
+    def chooseNumber(self, game, player, title, max):
+        raise NotImplementedError
+
+"""
+Decider that asks a human player using console input/output.
+"""
+class ConsoleDecider(Decider):
+    # Prints out a menu of options and returns the player's choice, indexed
+    # at 1. renderer is the TerminalRenderer the menu is printed below, if any.
+    @staticmethod
+    def printMenu(title, options, renderer = None):
+        index = 1
+        print()
+        print(title)
+        for option in options:
+            print("(" + str(index) + ") " + str(option))
+            index += 1
+        return ConsoleDecider.getPlayerChoiceFromInput(len(options), renderer)
+
+    # Prompts the player for a number between [1, max]. Every wrong answer
+    # prints another line, which could scroll the frame of the given
+    # TerminalRenderer, so it's told to redraw the next frame in full.
+    @staticmethod
+    def getPlayerChoiceFromInput(max, renderer = None):
+        while True:
+            try:
+                result = int(input("Enter a number: "))
+            except ValueError:
+                # Did not enter a number, try again
+                print("Must be a number!")
+                if renderer != None:
+                    renderer.invalidate()
+                continue
+
+            if result >= 1 and result <= max:
+                # Number is valid, return the value
+                return result
+            else:
+                # Number was not within right range, try again
+                print("Must be between 1 and " + str(max) + "!")
+                if renderer != None:
+                    renderer.invalidate()
+
+    # Hides the previous player's screen and waits so the next player can
+    # take the machine, using the given TerminalRenderer if there is one. The
+    # message is drawn as a frame, so only the rows that change are redrawn
+    # and everything below it is cleared.
+    @staticmethod
+    def changePlayerTo(playerName, renderer = None):
+        if renderer == None:
+            renderer = TerminalRenderer()
+        renderer.drawLines([
+            "===================================",
+            "= Please change to " + playerName + ".",
+            "===================================",
+            "",
+        ])
+        input("Press ENTER to continue...")
+
+    def startTurn(self, game, player):
+        ConsoleDecider.changePlayerTo(player.getName(), game.renderer)
+
+    def endTurn(self, game, player):
+        # Allow player to view their hand again, redrawing only what changed
+        game.printCurrentGameState(player)
+        input("Press Enter to continue...")
+
+    def chooseIndex(self, game, player, title, options):
+        return ConsoleDecider.printMenu(title, options, game.renderer)
+
+    def chooseNumber(self, game, player, title, max):
+        print(title)
+        return ConsoleDecider.getPlayerChoiceFromInput(max, game.renderer)
+
+"""
+Decider that picks uniformly random options, useful for simulations.
+"""
+class RandomDecider(Decider):
+    # Constructor with an optional random number generator and the number of
+    # cards after which the decider always stands
+    def __init__(self, rng = None, maxCards = 5):
+        self.rng = rng if rng != None else random.Random()
+        self.maxCards = maxCards
+
+    def chooseIndex(self, game, player, title, options):
+        if title == Decider.PLAY_AGAIN_MENU:
+            # Always keep playing
+            return 1
+        if title == Decider.DRAW_MENU:
+            # Stand once the hand is big enough or the deck has run out, so
+            # that the Draw Phase always comes to an end
+            numCards = len(player.getHand()) + len(player.getInterferenceField())
+            if numCards >= self.maxCards or "Draw" not in options:
+                return options.index("Stand") + 1
+        return self.rng.randint(1, len(options))
+
+    def chooseNumber(self, game, player, title, max):
+        return self.rng.randint(1, max)
+
+"""
+Decider that always calls and keeps drawing until its hand value reaches a
+threshold, then stands.
+"""
+class ThresholdDecider(Decider):
+    # Constructor with the hand value to stand at
+    def __init__(self, standValue = 18):
+        self.standValue = standValue
+
+    def chooseIndex(self, game, player, title, options):
+        if title == Decider.BETTING_MENU:
+            # Options are always [Fold, Call/Check/All-in, (Raise)]
+            return 2
+        if title == Decider.DRAW_MENU:
+            if player.calculateHandValue() < self.standValue and "Draw" in options:
+                return options.index("Draw") + 1
+            return options.index("Stand") + 1
+        return 1
+
+    def chooseNumber(self, game, player, title, max):
+        return 1
+
+def main():
+    decider = RandomDecider(random.Random(0))
+    options = ["Fold", "Call", "Raise"]
+    for i in range(5):
+        print(options[decider.answer(None, Decision.choose(None, Decider.BETTING_MENU, options)) - 1])
+
+if __name__ == "__main__":
+    main()
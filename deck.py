@@ -1,80 +1,158 @@
 from card import Card
+import itertools
 import random
 
+# Face cards, which appear twice in every deck
+FACE_CARDS = (
+    ("Queen of Air and Darkness", -2),
+    ("Endurance", -8),
+    ("Balance", -11),
+    ("Demise", -13),
+    ("Moderation", -14),
+    ("The Evil One", -15),
+    ("The Star", -17),
+    ("The Idiot", 0),
+)
+
+# Returns a tuple of every card in a Sabaac deck. Each card's id is its index
+# in the tuple.
+def createCardTable():
+    cards = []
+
+    # Add suit cards
+    # For each suit:
+    for suitIndex in range(1, 4 + 1):
+        # For each value:
+        for cardValue in range(1, 15 + 1):
+            # Add card with suit and value
+            cards.append(Card(suitIndex, cardValue, cardId=len(cards)))
+
+    # Add face cards
+    for name, value in FACE_CARDS:
+        cards.append(Card(Card.NO_SUIT, value, name, len(cards)))
+        cards.append(Card(Card.NO_SUIT, value, name, len(cards)))
+
+    return tuple(cards)
+
 """
-Deck class that represents a deck of cards.
+Deck class that represents a deck of cards. The 76 cards are created once and
+shared by every deck; a deck only stores the ids of its cards, with the top of
+the deck at the end of the list.
 """
 class Deck:
-    # Returns a complete, shuffled deck of Sabaac cards
+    CARDS = createCardTable()               # Every card, indexed by id
+    CARD_IDS = tuple(range(len(CARDS)))     # The id of every card, in order
+    NUM_CARDS = len(CARDS)                  # The number of cards in a full deck
+
+    # Returns a complete, shuffled deck of Sabaac cards, optionally shuffled
+    # with the given random.Random. numDecks full decks are shuffled together
+    # for large tables, so every card appears numDecks times.
     @staticmethod
-    def createDeck():
-        deck = Deck()
-        
-        # Add suit cards
-        # For each suit:
-        for suitIndex in range(1, 4 + 1):
-            # For each value:
-            for cardValue in range(1, 15 + 1):
-                # Add card with suit and value
-                card = Card(suitIndex, cardValue)
-                deck.addCard(card)
-        
-        # Add face cards
-        deck.addFaceCardPair("Queen of Air and Darkness", -2)
-        deck.addFaceCardPair("Endurance", -8)
-        deck.addFaceCardPair("Balance", -11)
-        deck.addFaceCardPair("Demise", -13)
-        deck.addFaceCardPair("Moderation", -14)
-        deck.addFaceCardPair("The Evil One", -15)
-        deck.addFaceCardPair("The Star", -17)
-        deck.addFaceCardPair("The Idiot", 0)
-        
+    def createDeck(rng = None, numDecks = 1):
+        deck = Deck(rng)
+        deck.deckList = list(Deck.CARD_IDS) * numDecks
+
         # Shuffle the deck
         deck.shuffle()
-        
+
         return deck
-        
-    # Constructor that creates an empty Deck
-    def __init__(self):
+
+    # Returns the card with the given id
+    @staticmethod
+    def getCard(cardId):
+        return Deck.CARDS[cardId]
+
+    # Constructor that creates an empty Deck, optionally with the random.Random
+    # used to shuffle it (the random module is used by default)
+    def __init__(self, rng = None):
         self.deckList = []
+        self.rng = rng if rng != None else random
+        self.isShared = False   # True if deckList may be shared with a clone
+
+    # Returns a copy of the deck, optionally with a different random.Random.
+    # Both decks share the same list of card ids until one of them changes.
+    def clone(self, rng = None):
+        deck = Deck(rng if rng != None else self.rng)
+        deck.deckList = self.deckList
+        deck.isShared = True
+        self.isShared = True
+        return deck
+
+    # Makes sure the deck has its own list of card ids before it's changed
+    def copyIfShared(self):
+        if self.isShared:
+            self.deckList = list(self.deckList)
+            self.isShared = False
 
     # Adds a card to the bottom of the deck
     def addCard(self, card):
-        self.deckList.append(card)
-        
-    # Adds a pair of identical cards to the bottom of the deck.
-    def addFaceCardPair(self, name, value):
-        card1 = Card(Card.NO_SUIT, value, name)
-        card2 = Card(Card.NO_SUIT, value, name)
-        self.addCard(card1)
-        self.addCard(card2)
-    
+        self.copyIfShared()
+        self.deckList.insert(0, card.getId())
+
+    # Inserts a card at a uniformly random position in the deck, in constant
+    # time: the card goes on top, then swaps places with a random card
+    # (possibly itself). If the deck was in a uniformly random order, it
+    # still is afterwards, just as if the whole deck had been shuffled.
+    def insertRandomly(self, card):
+        self.copyIfShared()
+        deckList = self.deckList
+        deckList.append(card.getId())
+        index = self.rng.randrange(len(deckList))
+        deckList[-1], deckList[index] = deckList[index], deckList[-1]
+
     # Shuffles the deck.
     def shuffle(self):
-        random.shuffle(self.deckList)
+        self.copyIfShared()
+        self.rng.shuffle(self.deckList)
 
-    # Returns and removes the first card from the deck.
+    # Returns and removes the top card from the deck.
     def draw(self):
-        if self.getDeckSize() <= 0:
+        if len(self.deckList) <= 0:
             return None
-        return self.deckList.pop(0)
-    
-    # Prints every card in the deck.
+        self.copyIfShared()
+        return Deck.CARDS[self.deckList.pop()]
+
+    # Prints every card in the deck, from the top.
     def printDeck(self):
-        for card in self.deckList:
-            print(card)
-            
-    # Returns the list of cards in the deck.
+        for cardId in reversed(self.deckList):
+            print(Deck.CARDS[cardId])
+
+    # Returns the list of card ids in the deck, with the top card last.
     def getDeckList(self):
         return self.deckList
-        
+
     # Returns the size of the deck.
     def getDeckSize(self):
         return len(self.deckList)
-            
+
+# Checks that inserting a card with insertRandomly leaves the deck in a
+# uniformly random order, by inserting a card into a shuffled 3 card deck many
+# times and counting how often each of the 24 orders comes up. Returns the
+# chi-squared statistic, which is below 41.64 99% of the time (23 degrees of
+# freedom) if every order is equally likely.
+def checkInsertionIsUniform(numTrials = 48000, seed = 0):
+    rng = random.Random(seed)
+    counts = {}
+    for i in range(numTrials):
+        deck = Deck(rng)
+        deck.deckList = [0, 1, 2]
+        deck.shuffle()
+        deck.insertRandomly(Deck.getCard(3))
+        order = tuple(deck.getDeckList())
+        counts[order] = counts.get(order, 0) + 1
+
+    expected = numTrials / 24
+    chiSquared = 0
+    for order in itertools.permutations(range(4)):
+        chiSquared += (counts.get(order, 0) - expected) ** 2 / expected
+    return chiSquared
+
 def main():
+    chiSquared = checkInsertionIsUniform()
+    print("insertRandomly chi-squared over 24 orders:", round(chiSquared, 2), "(uniform)" if chiSquared < 41.64 else "(NOT uniform)")
+
     deck = Deck.createDeck()
-    
+
     print(deck.getDeckSize())
     print(deck.draw())
     print(deck.draw())
@@ -85,4 +163,4 @@ def main():
     #print(str(len(deck.getDeckList())) + " should be 76")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
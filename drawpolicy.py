@@ -0,0 +1,375 @@
+from decider import Decider, ThresholdDecider
+from game import Game
+from odds import DrawOdds
+from player import Player
+import mmap
+import numpy as np
+import random
+import struct
+import sys
+import time
+
+"""
+DrawPolicySolver class that works out, offline, how to play the Draw Phase
+from any state a hand can be in: the total of the cards in hand, the number of
+cards in hand and the total of the Interference Field. It uses dynamic
+programming from the largest hands down, where every state's value is the
+better of Standing and Drawing.
+
+The model is a single player drawing from a deck with the given composition
+(cards are assumed to be drawn with replacement). After every action there's a
+SHIFT_CHANCE chance of a Shift, which replaces the hand's total with the total
+of as many random cards, and after Standing there's one more chance before the
+round is resolved. A final hand is worth its chance of beating numOpponents
+opponents; their hands are assumed to end up like the solver's own, which is
+found by solving a few times and feeding each result's final hand values into
+the next.
+
+Exchanging and inserting into the Interference Field depend on which cards are
+in hand, so they're compared at lookup time (see DrawPolicy.chooseAction)
+against the values in the table.
+"""
+class DrawPolicySolver:
+    # Constructor with the composition of the deck drawn from (see DrawOdds,
+    # a full deck by default), the number of opponents, the largest hand
+    # considered, and how many times to solve against the previous solution
+    def __init__(self, composition = None, numOpponents = 1, maxHandSize = 8, iterations = 3):
+        self.composition = composition if composition != None else DrawOdds.fullComposition()
+        self.numOpponents = numOpponents
+        self.maxHandSize = maxHandSize
+        self.iterations = iterations
+
+        counts = np.array(self.composition, dtype=np.float64)
+        self.probabilities = counts / counts.sum()  # Chance of drawing each value in DrawOdds.VALUES
+
+        # Range of hand and Interference Field totals in the table (totals
+        # outside of it are treated as the nearest total inside it)
+        self.minHandTotal = -20 * maxHandSize
+        self.numHandTotals = 2 * 20 * maxHandSize + 1
+        self.minFieldTotal = -60
+        self.numFieldTotals = 121
+
+        # shiftSums[n] is the chance of each hand total after a Shift deals n
+        # random cards, indexed by hand total
+        self.shiftSums = np.zeros((maxHandSize + 1, self.numHandTotals))
+        self.shiftSums[0, -self.minHandTotal] = 1
+        for n in range(1, maxHandSize + 1):
+            self.shiftSums[n] = self.addDraw(self.shiftSums[n - 1])
+
+    # Returns the distribution over hand totals after drawing one more card,
+    # given the distribution before (indexed by hand total). This moves
+    # chances forward, so it's only for distributions: see expectDraw for
+    # values.
+    def addDraw(self, distribution):
+        result = np.zeros_like(distribution)
+        for value, probability in zip(DrawOdds.VALUES, self.probabilities):
+            if probability > 0:
+                result += probability * self.shiftArray(distribution, value)
+        return result
+
+    # Returns the expected value of drawing one more card from each hand
+    # total, given the value of each hand total after the draw (indexed by
+    # hand total along the last axis). Drawing a card of value v takes a hand
+    # from h to h + v, so entry h reads the value at h + v, treating totals
+    # outside the table as the nearest total inside it.
+    def expectDraw(self, values):
+        result = np.zeros_like(values)
+        size = values.shape[-1]
+        for value, probability in zip(DrawOdds.VALUES, self.probabilities):
+            if probability > 0:
+                indices = np.clip(np.arange(size) + value, 0, size - 1)
+                result += probability * values[..., indices]
+        return result
+
+    # Returns the array with every entry moved up by the given number of
+    # indices along the last axis, piling up anything moved past the end on
+    # the last index
+    @staticmethod
+    def shiftArray(array, amount):
+        result = np.zeros_like(array)
+        size = array.shape[-1]
+        indices = np.clip(np.arange(size) + amount, 0, size - 1)
+        np.add.at(result, (..., indices), array)
+        return result
+
+    # Returns the value of every final hand total from minTotal up, given the
+    # chance of an opponent ending up with each score (indexed by score + 1,
+    # where a score of -1 is bombing out)
+    def getRewards(self, minTotal, numTotals, opponentScores):
+        beaten = np.concatenate(([0.0], np.cumsum(opponentScores)))    # beaten[k + 1] = chance score < k
+        rewards = np.zeros(numTotals)
+        for index in range(numTotals):
+            handValue = abs(minTotal + index)
+            if handValue <= Game.SABAAC_VALUE:
+                rewards[index] = beaten[handValue + 1] ** self.numOpponents
+        return rewards
+
+    # Solves the Draw Phase once, given the opponents' score chances. Returns
+    # (values, draws, shiftedValues): the value of each state indexed by
+    # [hand size, field total index, hand total index], whether Drawing beats
+    # Standing in that state, and the average value of each [hand size,
+    # field total index] after a Shift.
+    def solveOnce(self, opponentScores):
+        maxHandSize = self.maxHandSize
+        numFieldTotals = self.numFieldTotals
+        numHandTotals = self.numHandTotals
+        minTotal = self.minHandTotal + self.minFieldTotal
+        rewards = self.getRewards(minTotal, numHandTotals + numFieldTotals - 1, opponentScores)
+        keepChance = (1 - Game.SHIFT_CHANCE) ** 2   # No Shift after Standing or after betting
+
+        values = np.zeros((maxHandSize + 1, numFieldTotals, numHandTotals))
+        draws = np.zeros(values.shape, dtype=bool)
+        shiftedValues = np.zeros((maxHandSize + 1, numFieldTotals))
+        for n in range(maxHandSize, -1, -1):
+            # Value of Standing, with the final hand total h + f
+            stand = np.empty((numFieldTotals, numHandTotals))
+            for f in range(numFieldTotals):
+                finalRewards = rewards[f:(f + numHandTotals)]
+                stand[f] = keepChance * finalRewards + (1 - keepChance) * np.dot(self.shiftSums[n], finalRewards)
+
+            if n < maxHandSize:
+                # Value of Drawing: after drawing, a Shift may happen before the
+                # next decision
+                nextValues = values[n + 1]
+                afterShift = (1 - Game.SHIFT_CHANCE) * nextValues + Game.SHIFT_CHANCE * shiftedValues[n + 1][:, None]
+                draw = self.expectDraw(afterShift)
+                draws[n] = draw > stand
+                values[n] = np.maximum(draw, stand)
+            else:
+                values[n] = stand
+            shiftedValues[n] = values[n] @ self.shiftSums[n]
+        return values, draws, shiftedValues
+
+    # Returns the chance of each score (indexed by score + 1) for a player who
+    # is dealt a hand and plays the solution, without using the Interference
+    # Field
+    def getFinalScores(self, draws):
+        fieldIndex = -self.minFieldTotal
+        keepChance = (1 - Game.SHIFT_CHANCE) ** 2
+        finalTotals = np.zeros(self.numHandTotals)
+        hands = self.shiftSums[Game.STARTING_HAND_SIZE].copy()    # Chance of each hand total with n cards
+        for n in range(Game.STARTING_HAND_SIZE, self.maxHandSize + 1):
+            drawing = draws[n, fieldIndex] & (n < self.maxHandSize)
+            standing = np.where(drawing, 0, hands)
+            finalTotals += keepChance * standing + (1 - keepChance) * standing.sum() * self.shiftSums[n]
+            if n < self.maxHandSize:
+                drawn = self.addDraw(np.where(drawing, hands, 0))
+                hands = (1 - Game.SHIFT_CHANCE) * drawn + Game.SHIFT_CHANCE * drawn.sum() * self.shiftSums[n + 1]
+
+        scores = np.zeros(Game.SABAAC_VALUE + 2)
+        for index in range(self.numHandTotals):
+            handValue = abs(self.minHandTotal + index)
+            scores[handValue + 1 if handValue <= Game.SABAAC_VALUE else 0] += finalTotals[index]
+        return scores
+
+    # Solves the Draw Phase, returning (values, draws, shiftedValues) as in
+    # solveOnce
+    def solve(self):
+        # Start with opponents who Stand on the hand they're dealt
+        draws = np.zeros((self.maxHandSize + 1, self.numFieldTotals, self.numHandTotals), dtype=bool)
+        for i in range(self.iterations):
+            values, draws, shiftedValues = self.solveOnce(self.getFinalScores(draws))
+        return values, draws, shiftedValues
+
+    # Solves the Draw Phase and saves the table to a file (see DrawPolicy)
+    def save(self, path):
+        values, draws, shiftedValues = self.solve()
+        header = DrawPolicy.HEADER.pack(DrawPolicy.MAGIC, DrawPolicy.VERSION, self.maxHandSize, len(DrawOdds.VALUES),
+                                        self.minHandTotal, self.numHandTotals, self.minFieldTotal, self.numFieldTotals)
+        with open(path, "wb") as file:
+            file.write(header)
+            file.write(np.array(DrawOdds.VALUES, dtype="<i1").tobytes())
+            file.write(self.probabilities.astype("<f4").tobytes())
+            file.write(shiftedValues.astype("<f4").tobytes())
+            file.write(values.astype("<f4").tobytes())
+            file.write(np.packbits(draws).tobytes())
+
+"""
+DrawPolicy class that looks up moves in a table written by DrawPolicySolver.
+The file is memory-mapped rather than read, so loading it takes microseconds
+and every process that loads the same file shares one read-only copy. All
+numbers are little-endian:
+
+* Header: magic "SBDP", version (1 byte), largest hand size, number of card
+  values (1 byte each), lowest hand total, number of hand totals, lowest
+  Interference Field total, number of Interference Field totals (2 bytes each)
+* Each card value (1 byte each) and its chance of being drawn (4 byte floats)
+* The average value after a Shift, for each [hand size][field total] (floats)
+* The value of each [hand size][field total][hand total] (floats)
+* Whether Drawing beats Standing in each of those states (1 bit each)
+"""
+class DrawPolicy:
+    MAGIC = b"SBDP"
+    VERSION = 1
+    HEADER = struct.Struct("<4sBBBhHhH")
+
+    # Returns the policy in the given file
+    @staticmethod
+    def load(path):
+        with open(path, "rb") as file:
+            return DrawPolicy(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    # Constructor with the contents of a policy file (any buffer, such as an
+    # mmap or bytes)
+    def __init__(self, data):
+        magic, version, self.maxHandSize, numValues, self.minHandTotal, self.numHandTotals, \
+            self.minFieldTotal, self.numFieldTotals = DrawPolicy.HEADER.unpack_from(data)
+        if magic != DrawPolicy.MAGIC:
+            raise ValueError("Not a Sabaac draw policy")
+        if version != DrawPolicy.VERSION:
+            raise ValueError("Unsupported draw policy version " + str(version))
+        self.data = data
+
+        view = memoryview(data)
+        offset = DrawPolicy.HEADER.size
+        values = view[offset:(offset + numValues)].cast("b")
+        offset += numValues
+        probabilities = self.readFloats(view, offset, numValues)
+        offset += 4 * numValues
+        self.draws = [(values[i], probabilities[i]) for i in range(numValues) if probabilities[i] > 0]
+
+        numShifted = (self.maxHandSize + 1) * self.numFieldTotals
+        self.shiftedValues = self.readFloats(view, offset, numShifted)
+        offset += 4 * numShifted
+        numStates = numShifted * self.numHandTotals
+        self.values = self.readFloats(view, offset, numStates)
+        offset += 4 * numStates
+        self.drawBits = view[offset:(offset + (numStates + 7) // 8)]
+
+    # Returns count little-endian floats starting at offset, without copying
+    # them if possible
+    @staticmethod
+    def readFloats(view, offset, count):
+        floats = view[offset:(offset + 4 * count)].cast("f")
+        if sys.byteorder == "big":
+            floats = np.frombuffer(floats, dtype="<f4").tolist()
+        return floats
+
+    # Returns the index of a state in the table, treating totals outside the
+    # table as the nearest total inside it
+    def getIndex(self, handTotal, handSize, fieldTotal):
+        handIndex = min(max(handTotal - self.minHandTotal, 0), self.numHandTotals - 1)
+        fieldIndex = min(max(fieldTotal - self.minFieldTotal, 0), self.numFieldTotals - 1)
+        handSize = min(handSize, self.maxHandSize)
+        return (handSize * self.numFieldTotals + fieldIndex) * self.numHandTotals + handIndex
+
+    # Returns the value of a state (the chance of winning when playing well)
+    def getValue(self, handTotal, handSize, fieldTotal):
+        return self.values[self.getIndex(handTotal, handSize, fieldTotal)]
+
+    # Returns True if Drawing is better than Standing in a state
+    def shouldDraw(self, handTotal, handSize, fieldTotal):
+        if handSize >= self.maxHandSize:
+            return False
+        index = self.getIndex(handTotal, handSize, fieldTotal)
+        return (self.drawBits[index >> 3] >> (7 - (index & 7))) & 1 == 1
+
+    # Returns the value of a state right after an action, which a Shift may
+    # change before the next decision
+    def getValueAfterAction(self, handTotal, handSize, fieldTotal):
+        handSize = min(handSize, self.maxHandSize)
+        fieldIndex = min(max(fieldTotal - self.minFieldTotal, 0), self.numFieldTotals - 1)
+        shifted = self.shiftedValues[handSize * self.numFieldTotals + fieldIndex]
+        return (1 - Game.SHIFT_CHANCE) * self.getValue(handTotal, handSize, fieldTotal) + Game.SHIFT_CHANCE * shifted
+
+    # Returns the value of Drawing in a state: the chance of each card value
+    # times the value of the hand it leads to
+    def getDrawValue(self, handTotal, handSize, fieldTotal):
+        value = 0
+        for drawnValue, probability in self.draws:
+            value += probability * self.getValueAfterAction(handTotal + drawnValue, handSize + 1, fieldTotal)
+        return value
+
+    # Returns the best (option, card index) for a hand and Interference Field,
+    # out of the Draw Phase options available. The card index (indexed at 0)
+    # is the card to Exchange or insert, and None for Stand and Draw.
+    def chooseAction(self, hand, interferenceField, options):
+        handTotal = sum(card.getValue() for card in hand)
+        fieldTotal = sum(card.getValue() for card in interferenceField)
+        handSize = len(hand)
+
+        if "Draw" in options and self.shouldDraw(handTotal, handSize, fieldTotal):
+            best = ("Draw", None)
+        else:
+            best = ("Stand", None)
+        bestValue = self.getValue(handTotal, handSize, fieldTotal)
+
+        for index in range(handSize):
+            cardValue = hand[index].getValue()
+            if "Exchange" in options:
+                value = 0
+                for drawnValue, probability in self.draws:
+                    value += probability * self.getValueAfterAction(handTotal - cardValue + drawnValue, handSize, fieldTotal)
+                if value > bestValue:
+                    best = ("Exchange", index)
+                    bestValue = value
+            if "Insert into IF" in options:
+                value = self.getValueAfterAction(handTotal - cardValue, handSize - 1, fieldTotal + cardValue)
+                if value > bestValue:
+                    best = ("Insert into IF", index)
+                    bestValue = value
+        return best
+
+"""
+Decider that plays the Draw Phase using a DrawPolicy, and always calls when
+betting.
+"""
+class PolicyDecider(Decider):
+    # Constructor with the DrawPolicy to follow
+    def __init__(self, policy):
+        self.policy = policy
+        self.cardIndex = None   # Card chosen to Exchange or insert, if any
+
+    def chooseIndex(self, game, player, title, options):
+        if title == Decider.DRAW_MENU:
+            option, self.cardIndex = self.policy.chooseAction(player.getHand(), player.getInterferenceField(), options)
+            return options.index(option) + 1
+        if title == Decider.HAND_CARD_MENU and self.cardIndex != None:
+            return self.cardIndex + 1
+        if title == Decider.BETTING_MENU:
+            # Options are always [Fold, Call/Check/All-in, (Raise)]
+            return 2
+        return 1
+
+    def chooseNumber(self, game, player, title, max):
+        return 1
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else "drawpolicy.bin"
+    start = time.perf_counter()
+    DrawPolicySolver().save(path)
+    print("Solved and saved", path, "in", round(time.perf_counter() - start, 2), "seconds")
+
+    start = time.perf_counter()
+    policy = DrawPolicy.load(path)
+    print("Loaded in", round((time.perf_counter() - start) * 1e6), "microseconds")
+    for handTotal in (5, 12, 16, 18, 20, -20):
+        print("Hand total", handTotal, "with 2 cards:", "Draw" if policy.shouldDraw(handTotal, 2, 0) else "Stand",
+              "(value " + format(policy.getValue(handTotal, 2, 0), ".3f") + ")")
+
+    # Check the table against the chance of each drawn card times the value
+    # of the hand it leads to: Drawing's value where the policy Draws, and no
+    # more than the state's value where it Stands
+    numWrong = 0
+    for handSize in range(policy.maxHandSize):
+        for handTotal in range(-40, 41):
+            value = policy.getValue(handTotal, handSize, 0)
+            drawValue = policy.getDrawValue(handTotal, handSize, 0)
+            if policy.shouldDraw(handTotal, handSize, 0):
+                numWrong += abs(value - drawValue) > 1e-4
+            else:
+                numWrong += drawValue > value + 1e-4
+    print("States that disagree with the value of Drawing:", numWrong)
+
+    # Play the policy against a ThresholdDecider
+    wins = 0
+    numGames = 200
+    for i in range(numGames):
+        game = Game(["Policy", "Threshold"], deciders=[PolicyDecider(policy), ThresholdDecider()], headless=True, rng=random.Random(i))
+        game.playGame(50)
+        if len(game.playerList) > 0 and max(game.playerList, key=Player.getChips).getName() == "Policy":
+            wins += 1
+    print("Policy won", wins, "of", numGames, "games against ThresholdDecider")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+from deck import Deck
+from game import Game
+import numpy as np
+
+"""
+Equity class that holds the estimated chances of winning, tying and bombing
+out with a hand.
+"""
+class Equity:
+    # Constructor with the chances (between 0 and 1) of each outcome
+    def __init__(self, win, tie, bombOut):
+        self.win = win
+        self.tie = tie
+        self.bombOut = bombOut
+
+    # Allows Equity objects to be printed as strings
+    def __str__(self):
+        return "win " + format(self.win, ".1%") + ", tie " + format(self.tie, ".1%") + ", bomb out " + format(self.bombOut, ".1%")
+
+"""
+EquityEstimator class that estimates how likely a hand is to win if the player
+Stands, Draws or Exchanges, by dealing out the cards the player hasn't seen
+many times at once using NumPy.
+
+Opponents are assumed to stand with their current hidden cards, and no more
+Shifts are assumed to happen.
+"""
+class EquityEstimator:
+    ACTIONS = ("Stand", "Draw", "Exchange")
+
+    # Values of every card, indexed by card id
+    CARD_VALUES = np.array([card.getValue() for card in Deck.CARDS], dtype=np.int16)
+
+    # Returns the score resolveRound would give each hand: -1 if it bombs out,
+    # Game.IDIOTS_ARRAY_VALUE or Game.PURE_SABAAC_VALUE for a Sabaac, and the
+    # hand value otherwise
+    @staticmethod
+    def scoreHands(totals, hasIdiot, has2, has3):
+        handValues = np.abs(totals)
+        scores = np.where(handValues == Game.SABAAC_VALUE, Game.PURE_SABAAC_VALUE, handValues)
+        scores = np.where(hasIdiot & has2 & has3, Game.IDIOTS_ARRAY_VALUE, scores)
+        return np.where(handValues > Game.SABAAC_VALUE, -1, scores)
+
+    # Constructor with the number of deals to sample per estimate and an
+    # optional seed for the random number generator
+    def __init__(self, numSamples = 1000, seed = None):
+        self.numSamples = numSamples
+        self.rng = np.random.default_rng(seed)
+
+    # Returns a (numSamples x numDealt) array where each row is numDealt distinct
+    # random indices between [0, numCards), using a partial Fisher-Yates shuffle
+    # run on every row at once
+    def dealIndices(self, numCards, numDealt):
+        indices = np.tile(np.arange(numCards), (self.numSamples, 1))
+        rows = np.arange(self.numSamples)
+        for i in range(numDealt):
+            swapWith = self.rng.integers(i, numCards, size=self.numSamples)
+            swapped = indices[rows, swapWith]
+            indices[rows, swapWith] = indices[:, i]
+            indices[:, i] = swapped
+        return indices[:, :numDealt]
+
+    # Returns a dictionary from each action ("Stand", "Draw", "Exchange") to its
+    # Equity. hand and interferenceField are the player's cards, opponentFields
+    # is a list of the opponents' face-up Interference Fields, and
+    # opponentHandSizes optionally gives how many hidden cards each opponent
+    # holds (2 each by default). numDecks is the number of decks shuffled
+    # together. The Exchange result is for the best card to exchange, whose
+    # hand index is stored in the result's exchangeIndex.
+    def estimate(self, hand, interferenceField, opponentFields, numOpponents, opponentHandSizes = None, numDecks = 1):
+        # Pad out opponents whose Interference Fields are empty
+        opponentFields = list(opponentFields) + [[]] * (numOpponents - len(opponentFields))
+        if opponentHandSizes == None:
+            opponentHandSizes = [Game.STARTING_HAND_SIZE] * numOpponents
+
+        # Every card not in the player's hand or in any Interference Field
+        # could be in an opponent's hand or drawn next. There are numDecks
+        # copies of each card, so the seen cards are counted off.
+        seenIds = [card.getId() for card in hand]
+        seenIds += [card.getId() for card in interferenceField]
+        for field in opponentFields:
+            seenIds += [card.getId() for card in field]
+        counts = np.full(Deck.NUM_CARDS, numDecks)
+        np.subtract.at(counts, np.array(seenIds, dtype=np.intp), 1)
+        unseenIds = np.repeat(np.arange(Deck.NUM_CARDS), np.maximum(counts, 0))
+
+        # Deal out the hidden cards: each row is one sample, with the opponents'
+        # hidden cards first followed by the card the player would draw
+        numHidden = sum(opponentHandSizes)
+        numDealt = min(numHidden + 1, len(unseenIds))
+        order = self.dealIndices(len(unseenIds), numDealt)
+        values = EquityEstimator.CARD_VALUES[unseenIds[order]]
+
+        # Score every opponent's hand in every sample
+        bestOpponent = np.full(self.numSamples, -1)
+        start = 0
+        for i in range(numOpponents):
+            end = min(start + opponentHandSizes[i], numHidden, numDealt)
+            hidden = values[:, start:end]
+            fieldValues = [card.getValue() for card in opponentFields[i]]
+            totals = hidden.sum(axis=1) + sum(fieldValues)
+            scores = EquityEstimator.scoreHands(totals,
+                (hidden == 0).any(axis=1) | (0 in fieldValues),
+                (hidden == 2).any(axis=1) | (2 in fieldValues),
+                (hidden == 3).any(axis=1) | (3 in fieldValues))
+            bestOpponent = np.maximum(bestOpponent, scores)
+            start = end
+
+        # The card the player would draw (if any are left)
+        if numDealt > numHidden:
+            drawn = values[:, numHidden]
+        else:
+            drawn = None
+
+        ownValues = [card.getValue() for card in hand] + [card.getValue() for card in interferenceField]
+        results = {}
+        results["Stand"] = self.compareHands(ownValues, None, bestOpponent)
+        if drawn is not None:
+            results["Draw"] = self.compareHands(ownValues, drawn, bestOpponent)
+
+            # Try exchanging each card in hand and keep the best one
+            bestExchange = None
+            for index in range(len(hand)):
+                exchangedValues = ownValues[:index] + ownValues[(index + 1):]
+                equity = self.compareHands(exchangedValues, drawn, bestOpponent)
+                equity.exchangeIndex = index
+                if bestExchange == None or equity.win > bestExchange.win:
+                    bestExchange = equity
+            if bestExchange != None:
+                results["Exchange"] = bestExchange
+        return results
+
+    # Returns the Equity of the player's card values (plus the drawn card in
+    # each sample, if given) against the best opponent score in each sample
+    def compareHands(self, ownValues, drawn, bestOpponent):
+        total = sum(ownValues)
+        hasIdiot = 0 in ownValues
+        has2 = 2 in ownValues
+        has3 = 3 in ownValues
+        if drawn is not None:
+            total = total + drawn
+            hasIdiot = hasIdiot | (drawn == 0)
+            has2 = has2 | (drawn == 2)
+            has3 = has3 | (drawn == 3)
+        scores = EquityEstimator.scoreHands(np.broadcast_to(total, bestOpponent.shape),
+            np.broadcast_to(hasIdiot, bestOpponent.shape),
+            np.broadcast_to(has2, bestOpponent.shape),
+            np.broadcast_to(has3, bestOpponent.shape))
+
+        # resolveRound only has a winner if exactly one player has the best hand
+        bombOut = scores < 0
+        win = ~bombOut & (scores > bestOpponent)
+        tie = ~bombOut & (scores == bestOpponent)
+        return Equity(win.mean(), tie.mean(), bombOut.mean())
+
+def main():
+    deck = Deck.createDeck()
+    hand = [deck.draw(), deck.draw()]
+    opponentField = [deck.draw()]
+
+    print("Hand:", ", ".join(str(card) for card in hand))
+    print("Opponent's Interference Field:", opponentField[0])
+    results = EquityEstimator(seed=0).estimate(hand, [], [opponentField], 3)
+    for action in EquityEstimator.ACTIONS:
+        if action in results:
+            print(action + ":", results[action])
+
+if __name__ == "__main__":
+    main()
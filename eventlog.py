@@ -0,0 +1,122 @@
+from array import array
+
+"""
+EventLog class that records what happens in a round as typed events instead of
+text. Each event is an event type, the player it's about (or None) and up to
+two amounts, stored in compact parallel arrays. Text is only built when
+getLines() is called, so headless games never format any strings.
+"""
+class EventLog:
+    # Event types
+    KICKED = 0              # Player was kicked for being broke
+    FOLDED = 1
+    CHECKED = 2
+    CALLED = 3              # amount: chips paid
+    ALL_IN = 4              # amount: chips paid
+    RAISED = 5              # amount: chips raised by, extra: chips paid in total
+    STOOD = 6
+    DREW = 7
+    EXCHANGED = 8
+    INSERTED_INTO_IF = 9
+    REMOVED_FROM_IF = 10
+    SWAPPED_WITH_IF = 11
+    SHIFTED = 12            # No player
+    BOMBED_OUT = 13         # amount: hand value
+    IDIOTS_ARRAY = 14
+    PURE_SABAAC = 15
+    HAND_VALUE = 16         # amount: hand value
+    SABAAC_TIE = 17         # No player
+    TIE = 18                # No player
+    LOST_TO_SABAAC_POT = 19 # No player, amount: chips lost
+    WON_SABAAC_POT = 20
+    WON = 21
+
+    # Text for each event type, filled in with the player's name and amounts
+    TEMPLATES = (
+        "{name} was kicked from the match.",
+        "{name} folded.",
+        "{name} checked.",
+        "{name} called, entering {amount} into the hand pot.",
+        "{name} WENT ALL IN, entering {amount} into the hand pot.",
+        "{name} raised the hand pot by {amount}, paying a total of {extra}.",
+        "{name} stood.",
+        "{name} drew a card.",
+        "{name} exchanged a card.",
+        "{name} put a card into their interference field.",
+        "{name} removed a card from their interference field.",
+        "{name} swapped a card from their interference field.",
+        "CARDS SHIFTED!",
+        "{name} bombed out with a hand value of {amount}",
+        "{name} got an Idiot's Array!",
+        "{name} got a Pure Sabaac!",
+        "{name} has a hand value of {amount}",
+        "It's a tie between Sabaac winners, no one wins the sabaac pot",
+        "It's a tie!",
+        "{amount} chips are lost to the Sabaac pot",
+        "{name} WINS THE SABAAC POT!",
+        "{name} wins!",
+    )
+
+    # Name of each event type, used when exporting metrics
+    NAMES = (
+        "kicked", "folded", "checked", "called", "all_in", "raised", "stood", "drew", "exchanged",
+        "inserted_into_if", "removed_from_if", "swapped_with_if", "shifted", "bombed_out", "idiots_array",
+        "pure_sabaac", "hand_value", "sabaac_tie", "tie", "lost_to_sabaac_pot", "won_sabaac_pot", "won",
+    )
+
+    # Constructor that creates an empty log
+    def __init__(self):
+        self.eventTypes = array("B")
+        self.players = []
+        self.amounts = array("i")
+        self.extras = array("i")
+        self.numClears = 0      # Number of times the log has been cleared
+
+    # Records an event
+    def add(self, eventType, player = None, amount = 0, extra = 0):
+        self.eventTypes.append(eventType)
+        self.players.append(player)
+        self.amounts.append(amount)
+        self.extras.append(extra)
+
+    # Removes every event
+    def clear(self):
+        del self.eventTypes[:]
+        del self.players[:]
+        del self.amounts[:]
+        del self.extras[:]
+        self.numClears += 1
+
+    # Returns the number of events
+    def __len__(self):
+        return len(self.eventTypes)
+
+    # Allows the log to be iterated over as (event type, player, amount, extra)
+    # tuples
+    def __iter__(self):
+        return zip(self.eventTypes, self.players, self.amounts, self.extras)
+
+    # Returns the text of the event at the given index
+    def getLine(self, index):
+        player = self.players[index]
+        name = player.getName() if player != None else ""
+        return EventLog.TEMPLATES[self.eventTypes[index]].format(name=name, amount=self.amounts[index], extra=self.extras[index])
+
+    # Returns a generator over the text of every event
+    def getLines(self):
+        for index in range(len(self.eventTypes)):
+            yield self.getLine(index)
+
+    # Returns the number of events of the given type
+    def count(self, eventType):
+        return self.eventTypes.count(eventType)
+
+def main():
+    log = EventLog()
+    log.add(EventLog.SHIFTED)
+    log.add(EventLog.LOST_TO_SABAAC_POT, amount=12)
+    for line in log.getLines():
+        print(line)
+
+if __name__ == "__main__":
+    main()
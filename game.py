@@ -1,6 +1,11 @@
+from betting import BettingRound
 from card import Card
 from deck import Deck
+from decider import Decider, Decision
+from eventlog import EventLog
+from handclassifier import HandClassifier
 from player import Player
+from renderer import TerminalRenderer
 import random
 
 """
@@ -15,119 +20,248 @@ class Game:
     
     PURE_SABAAC_VALUE = 999
     IDIOTS_ARRAY_VALUE = 1000
-    MAX_PLAYERS = 20
+    MAX_PLAYERS = 20            # The most players dealt from a single deck
+    MAX_DECKS = 10              # The most decks a table is set up with in main()
     
-    # Prints out a menu of options and returns the player's choice, indexed at 1
-    @staticmethod
-    def printMenu(title, options, indexOnly=False):
-        index = 1
-        print()
-        print(title)
-        for option in options:
-            print("(" + str(index) + ") " + str(option))
-            index += 1 # index = index + 1
-        chosenIndex = Game.getPlayerChoiceFromInput(len(options))
-        if indexOnly:
-            return chosenIndex
-        return options[chosenIndex - 1]
-    
-    # Prompts the player for a number between [1, max]
-    @staticmethod
-    def getPlayerChoiceFromInput(max):
-        while True:
-            try:
-                result = int(input("Enter a number: "))
-            except ValueError:
-                # Did not enter a number, try again
-                print("Must be a number!")
-                continue
-            
-            if result >= 1 and result <= max:
-                # Number is valid, return the value
-                return result
-            else:
-                # Number was not within right range, try again
-                print("Must be between 1 and " + str(max) + "!")
-                
-    @staticmethod
-    def changePlayerTo(playerName):
-        numWhitespace = 50
-        for i in range(numWhitespace):
-            print()
-            
-        print("===================================")
-        print("= Please change to " + playerName + ".")
-        print("===================================")
-        print()
-        input("Press ENTER to continue...")
-            
-        for i in range(numWhitespace):
-            print()
+    # Phases of a round, in order
+    ANTE_BETTING_PHASE = 0      # First round of betting, with hand pot ante
+    DRAWING_PHASE = 1
+    FINAL_BETTING_PHASE = 2
+    RESOLVED_PHASE = 3          # The winner has been determined
+    PHASE_NAMES = ("ante_betting", "drawing", "final_betting", "resolve")
+    
+    # Lookup tables used to classify hands in resolveRound
+    CLASSIFIER = HandClassifier(SABAAC_VALUE, PURE_SABAAC_VALUE, IDIOTS_ARRAY_VALUE)
+    
+    # Event logged for each hand category, indexed by category
+    CATEGORY_EVENTS = (EventLog.BOMBED_OUT, EventLog.HAND_VALUE, EventLog.PURE_SABAAC, EventLog.IDIOTS_ARRAY)
     
-    # Constructor that creates a game with the given player list and starting chips
-    def __init__(self, playerNameList, startingChips = 30):
+    # Constructor that creates a game with the given player list and starting chips.
+    # deciders is an optional list with a Decider for each player (the console
+    # is used by default), and a headless game prints nothing to the console.
+    # rng is the random.Random used for all of this game's shuffles and Shifts
+    # (a new one is created by default). metrics is an optional GameMetrics
+    # that collects timings and counters (see metrics.py), and exporter an
+    # optional RoundExporter that writes a record of every round and choice
+    # (see roundexport.py). numDecks is the number of decks shuffled together
+    # each round; by default there's one for every MAX_PLAYERS players.
+    def __init__(self, playerNameList, startingChips = 30, deciders = None, headless = False, rng = None, metrics = None, exporter = None, numDecks = None):
+        if numDecks == None:
+            numDecks = Game.getNumDecks(len(playerNameList))
+        if len(playerNameList) > Game.MAX_PLAYERS * numDecks:
+            raise ValueError(str(len(playerNameList)) + " players are too many for " + str(numDecks) + " deck(s)")
+        self.numDecks = numDecks
         self.playerList = []
+        self.headless = headless
+        self.rng = rng if rng != None else random.Random()
+        self.renderer = TerminalRenderer()
+        self.metrics = metrics
+        self.exporter = exporter
         
-        # Add players to playerList with startingChips
-        for playerName in playerNameList:
-            player = Player(playerName)
+        # Add players to playerList with startingChips. Each player's seat id
+        # is their index in playerNameList.
+        for i in range(len(playerNameList)):
+            decider = None
+            if deciders != None:
+                decider = deciders[i]
+            player = Player(playerNameList[i], decider, i)
             player.changeChips(startingChips)
             self.playerList.append(player)
         
         # Placeholder values
         self.currentPlayers = []
+        self.numSeats = len(playerNameList)
+        self.inRound = bytearray(self.numSeats)    # 1 for the seat of each player who hasn't folded this round
         self.deck = None
         self.handPot = 0
         self.sabaacPot = 0
-        self.actionLog = []
+        self.actionLog = EventLog()
+        self.roundsPlayed = 0           # Number of rounds started with doRound
+        self.eliminatedPlayers = []     # Players kicked for being broke, in order
+        self.phase = Game.RESOLVED_PHASE
+        
+        self.betting = None             # BettingRound of the current betting phase, if any
+        self.drawSeat = None            # Seat of the player whose Draw Phase turn it is, if any
+        self.drawActed = False          # Whether anyone has done more than Stand this Draw Phase cycle
+    
+    # Returns a copy of the game for looking ahead, with its own players, deck
+    # order and pots. Cards are shared, and the deck's list of card ids is only
+    # copied once either game changes it. deciders optionally replaces each
+    # player's Decider (by position in playerList), and rng the random.Random
+    # (a new one is created by default). The copy starts with an empty action
+    # log and is headless unless told otherwise. Metrics aren't collected and
+    # nothing is exported for the copy.
+    def clone(self, deciders = None, rng = None, headless = True):
+        game = Game.__new__(Game)
+        game.headless = headless
+        game.rng = rng if rng != None else random.Random()
+        game.renderer = self.renderer
+        game.metrics = None
+        game.exporter = None
+        
+        # Copy players, keeping track of each copy so currentPlayers can refer
+        # to the copies
+        game.playerList = []
+        copies = {}
+        for i in range(len(self.playerList)):
+            player = self.playerList[i]
+            copy = player.clone(deciders[i] if deciders != None else None)
+            game.playerList.append(copy)
+            copies[player] = copy
+        game.currentPlayers = [copies[player] if player in copies else player.clone() for player in self.currentPlayers]
+        game.numSeats = self.numSeats
+        game.inRound = bytearray(self.inRound)
+        game.numDecks = self.numDecks
+        
+        game.deck = self.deck.clone(game.rng) if self.deck != None else None
+        game.handPot = self.handPot
+        game.sabaacPot = self.sabaacPot
+        game.actionLog = EventLog()
+        game.roundsPlayed = self.roundsPlayed
+        game.eliminatedPlayers = self.eliminatedPlayers[:]
+        game.phase = self.phase
+        game.betting = self.betting.clone([copies[player] for player in self.betting.players]) if self.betting != None else None
+        game.drawSeat = self.drawSeat
+        game.drawActed = self.drawActed
+        return game
     
     # Resets player hands, hand pot, etc.
     def resetRound(self):
         # Reset current player list
         self.currentPlayers = [ player for player in self.playerList ]
+        self.inRound = bytearray(self.numSeats)
         
         # Empty all hands
         for player in self.playerList:
             player.emptyHand()
             player.emptyInterferenceField()
+            self.inRound[player.seat] = 1
 
         # Reset hand pot
         self.handPot = 0
         
         # Reset deck
-        self.deck = Deck.createDeck()
+        self.deck = Deck.createDeck(self.rng, self.numDecks)
         
         # Reset action log
-        self.actionLog = []
+        self.actionLog.clear()
+    
+    # Returns the number of decks needed for the given number of players
+    @staticmethod
+    def getNumDecks(numPlayers):
+        return max(1, (numPlayers + Game.MAX_PLAYERS - 1) // Game.MAX_PLAYERS)
     
-    def playGame(self):
+    # Returns True if the player hasn't folded this round
+    def isInRound(self, player):
+        return self.inRound[player.seat] != 0
+    
+    # Prints the given values, unless the game is headless
+    def output(self, *values):
+        if not self.headless:
+            print(*values)
+            self.renderer.invalidate()     # The text may have scrolled the last frame
+    
+    # Runs the steps of a phase (a generator that yields Decisions), asking
+    # each player's Decider to answer them, and returns the phase's result
+    def runSteps(self, steps):
+        answer = None
+        while True:
+            try:
+                decision = steps.send(answer)
+            except StopIteration as stop:
+                return stop.value
+            answer = decision.player.getDecider().answer(self, decision)
+    
+    # Plays rounds until one or no players remain, or until maxRounds rounds
+    # have been played if given
+    def playGame(self, maxRounds = None):
         # While there are two or more players, keep playing
         while len(self.playerList) > 1:
+            if maxRounds != None and self.roundsPlayed >= maxRounds:
+                self.output("Reached the maximum of", maxRounds, "rounds, game over!")
+                return
             self.doRound()
 
         if len(self.playerList) <= 0:
-            print("No players remaining, game over!")
+            self.output("No players remaining, game over!")
         elif len(self.playerList) == 1:
-            print(self.playerList[0].getName() + " is the last player remaining, game over!")
+            self.output(self.playerList[0].getName() + " is the last player remaining, game over!")
     
     # Plays a single round of Sabaac
     def doRound(self):
-        self.doSabaacPhase()  # Sabaac pot ante (forced) & eliminating broke players
+        self.runSteps(self.roundSteps())
+    
+    # Steps of a single round of Sabaac, yielding every Decision the players
+    # need to make
+    def roundSteps(self):
+        self.roundsPlayed += 1
+        if self.metrics != None:
+            self.metrics.increment("rounds_total")
+        self.timePhase("sabaac", self.doSabaacPhase)    # Sabaac pot ante (forced) & eliminating broke players
         
         # Sabaac phase can result in eliminations, so check that the game isn't
         # over before continuing
         if len(self.playerList) <= 1:
             return
         
-        self.resetRound()           # Begin the actual round
-        self.dealCards()            # Deal cards to everyone
-        self.doBettingPhase(True)   # First round of betting, with hand pot ante
-        self.attemptShift()
-        self.doDrawingPhase()       # Allow players to draw, exchange, or discard
-        self.doBettingPhase(False)  # Second round of betting
-        self.attemptShift()
-        self.resolveRound()         # Determine the winner
-        self.confirmPlayAgain()     # Allow players to continue or quit
+        self.timePhase("reset", self.resetRound)    # Begin the actual round
+        self.timePhase("deal", self.dealCards)      # Deal cards to everyone
+        yield from self.phaseSteps(Game.ANTE_BETTING_PHASE)
+        yield from self.timeSteps("play_again", self.playAgainSteps())  # Allow players to continue or quit
+    
+    # Calls the function, timing it as the given phase if metrics are being
+    # collected, and returns its result
+    def timePhase(self, phaseName, function):
+        if self.metrics == None:
+            return function()
+        return self.metrics.timeCall(self, phaseName, function)
+    
+    # Returns the steps, timed as the given phase if metrics are being
+    # collected
+    def timeSteps(self, phaseName, steps):
+        if self.metrics == None:
+            return steps
+        return self.metrics.timeSteps(self, phaseName, steps)
+    
+    # Steps of the round from the given phase until the winner is determined.
+    # steps optionally replaces the steps of the first phase, which is used to
+    # continue a phase partway through (see continueBettingSteps and
+    # continueDrawingSteps).
+    def phaseSteps(self, phase, steps = None):
+        while phase != Game.RESOLVED_PHASE:
+            self.phase = phase
+            if steps == None:
+                steps = self.getPhaseSteps(phase)
+            yield from self.timeSteps(Game.PHASE_NAMES[phase], self.exportSteps(phase, steps))
+            steps = None
+            if phase != Game.DRAWING_PHASE:
+                self.attemptShift()     # Players have a chance to Shift after betting
+            phase += 1
+        
+        self.phase = Game.RESOLVED_PHASE
+        self.timePhase(Game.PHASE_NAMES[phase], self.exportResolve)     # Determine the winner
+    
+    # Returns the steps of the given phase, recorded by the exporter if there
+    # is one
+    def exportSteps(self, phase, steps):
+        if self.exporter == None:
+            return steps
+        return self.exporter.exportSteps(self, phase, steps)
+    
+    # Resolves the round, passing the result to the exporter if there is one
+    def exportResolve(self):
+        if self.exporter == None:
+            self.resolveRound()
+        else:
+            self.exporter.exportResolve(self)
+    
+    # Returns the steps of the given phase
+    def getPhaseSteps(self, phase):
+        if phase == Game.ANTE_BETTING_PHASE:
+            return self.bettingPhaseSteps(True)     # First round of betting, with hand pot ante
+        if phase == Game.DRAWING_PHASE:
+            return self.drawingPhaseSteps()         # Allow players to draw, exchange, or discard
+        return self.bettingPhaseSteps(False)        # Second round of betting
     
     # Deals cards to all players
     def dealCards(self):
@@ -140,157 +274,146 @@ class Game:
     # are eliminated. This is the only phase where players are eliminated
     # for being broke.
     def doSabaacPhase(self):
-        # Create a copy since we are deleting during iteration
-        allPlayers = [ player for player in self.playerList ]
+        # Build the list of players who stay in, instead of removing each
+        # eliminated player from the list
+        remainingPlayers = []
         
-        for player in allPlayers:
+        for player in self.playerList:
             if player.getChips() <= Game.SABAAC_POT_ANTE:
-                # Player is eliminated, remove them from the list
-                self.playerList.remove(player)
+                # Player is eliminated, leave them out of the list
+                self.eliminatedPlayers.append(player)
                 if player.getChips() > 0:
                     # Taunt them if they weren't completely broke
-                    print("Sorry,", player.getName() + ". The House always wins :)")
-                self.actionLog.append(player.getName() + " was kicked from the match.")
+                    self.output("Sorry,", player.getName() + ". The House always wins :)")
+                self.actionLog.add(EventLog.KICKED, player)
             else:
                 # Player pays Sabaac pot ante to stay in the game
                 player.changeChips(-Game.SABAAC_POT_ANTE)
                 self.sabaacPot += Game.SABAAC_POT_ANTE
+                remainingPlayers.append(player)
+        self.playerList[:] = remainingPlayers
     
     # Betting phase where players can pay hand pot ante and choose to raise the bet
     def doBettingPhase(self, withAnte):
+        self.runSteps(self.bettingPhaseSteps(withAnte))
+    
+    # Steps of the betting phase, yielding every Decision the players need to make
+    def bettingPhaseSteps(self, withAnte):
         # If all but one player has folded, skip this phase
         if len(self.currentPlayers) <= 1:
             return
         
-        # Create a queue of remaining players that need to bet
-        # Starts with all players still in the round, so makes a copy
-        remainingPlayers = [ player for player in self.currentPlayers ]
-        minCost = 0
-        
-        if withAnte:
-            # If it's the first round of betting, the hand pot ante is
-            # automatically added. This means it's possible to fold to bow
-            # out of the round, avoiding the hand pot ante (but not the Sabaac
-            # pot ante).
-            minCost = Game.HAND_POT_ANTE
-            
-        # Create a dictionary of current players and how much they've paid
-        # during this betting phase
-        totalPaidPerPlayer = {}
         numAbleToBet = 0
         for player in self.currentPlayers:
             if player.getChips() > 0:
                 numAbleToBet += 1
-            totalPaidPerPlayer[player.getName()] = 0
             
         # Skip if there's 1 or less players with the ability to bet
         # Players with 0 chips are not eliminated, just broke
         if numAbleToBet <= 1:
             return
         
-        # Loop until the queue is empty:
-        while len(remainingPlayers) > 0:
-            # Get player from front of queue
-            player = remainingPlayers.pop(0)
+        # If it's the first round of betting, the hand pot ante is
+        # automatically added. This means it's possible to fold to bow
+        # out of the round, avoiding the hand pot ante (but not the Sabaac
+        # pot ante).
+        minCost = Game.HAND_POT_ANTE if withAnte else 0
+        self.betting = BettingRound(self.currentPlayers, minCost)
+        yield from self.continueBettingSteps()
+    
+    # Steps of the rest of the betting phase, starting with the turn of the
+    # player the BettingRound is pointing at. Players who fold are only marked
+    # in inRound until the phase ends, when they're all dropped from
+    # currentPlayers at once.
+    def continueBettingSteps(self):
+        betting = self.betting
+        while not betting.isOver():
+            player = betting.getPlayer()
             
             # Skip the player if they're broke
             if player.getChips() <= 0:
+                betting.skip()
                 continue
             
-            Game.changePlayerTo(player.getName())
+            yield Decision.startTurn(player)
             
-            amountNeeded = minCost - totalPaidPerPlayer[player.getName()]
+            amountNeeded = betting.getAmountNeeded()
             
             # Print the game state + how much the player needs to pay:
-            self.printCurrentGameState(player)
-            print("Need to Pay:", amountNeeded)
+            self.printCurrentGameState(player, ["Need to Pay: " + str(amountNeeded)])
             
-            actions = [ "Fold", "Call" ]
-            
-            if minCost == 0:
-                # Turn "Call" into "Check" since there is no cost
-                actions[1] = "Check"
-            elif amountNeeded >= player.getChips():
-                # Turn "Call" into "All-in"
-                actions[1] = "All-in"
-                
-            # If player has more chips than the current amount, allow them
-            # to Raise as well
-            if amountNeeded < player.getChips():
-                actions.append("Raise")
-            
-            choice = Game.printMenu("BETTING PHASE", actions)
+            actions = betting.getActions()
+            choice = actions[(yield Decision.choose(player, Decider.BETTING_MENU, actions)) - 1]
             if choice == "Fold":
-                self.currentPlayers.remove(player)
-                self.actionLog.append(player.getName() + " folded.")
-                
-                if len(self.currentPlayers) <= 1:
-                    return
-            if choice == "Call" or choice == "Check" or choice == "All-in":
-                if minCost == 0:
-                    self.actionLog.append(player.getName() + " checked.")
-                    # Check, do nothing
-                    continue
-                
-                if amountNeeded > player.getChips():
-                    # Player does not have enough chips, all-in
-                    amountNeeded = player.getChips()
-                    self.actionLog.append(player.getName() + " WENT ALL IN, entering " + str(amountNeeded) + " into the hand pot.")
+                betting.fold()
+                self.inRound[player.seat] = 0
+                self.actionLog.add(EventLog.FOLDED, player)
+            elif choice == "Raise":
+                # Can raise by at most what's left after paying the amount needed
+                amountToRaise = yield Decision.number(player, Decider.RAISE_MENU, player.getChips() - amountNeeded)
+                amountPaid = betting.raiseBy(amountToRaise)
+                self.actionLog.add(EventLog.RAISED, player, amountToRaise, amountPaid)
+                player.changeChips(-amountPaid)
+                self.handPot += amountPaid
+            elif betting.minCost == 0:
+                # Check, do nothing
+                betting.call()
+                self.actionLog.add(EventLog.CHECKED, player)
+            else:
+                # Pay up to the amount needed, going all-in if the player
+                # does not have enough chips
+                amountPaid = betting.call()
+                if amountPaid < amountNeeded:
+                    self.actionLog.add(EventLog.ALL_IN, player, amountPaid)
                 else:
-                    self.actionLog.append(player.getName() + " called, entering " + str(amountNeeded) + " into the hand pot.")
-                
-                # Pay up to the amount needed
-                player.changeChips(-amountNeeded)
-                self.handPot += amountNeeded
-                totalPaidPerPlayer[player.getName()] += amountNeeded
-            if choice == "Raise":
-                print("Input number of chips to raise by.")
-                amountToRaise = Game.getPlayerChoiceFromInput(player.getChips() - minCost)
-                
-                # Update amountNeeded
-                amountNeeded = amountToRaise + minCost - totalPaidPerPlayer[player.getName()]
-                
-                self.actionLog.append(player.getName() + " raised the hand pot by " + str(amountToRaise) + ", paying a total of " + str(amountNeeded) + ".")
-                player.changeChips(-amountNeeded)
-                self.handPot += amountNeeded
-                totalPaidPerPlayer[player.getName()] += amountNeeded
-                minCost += amountToRaise
-                
-                # Reset the queue starting with the NEXT player
-                # All players EXCEPT for the current player must now choose to
-                # call or raise again
-                playerIndex = self.currentPlayers.index(player)
-                
-                # Reset the queue
-                remainingPlayers = []
-                
-                # Add all players after the current player
-                for other in self.currentPlayers[(playerIndex + 1):]:
-                    remainingPlayers.append(other)
-                
-                # All all players before the current player
-                for other in self.currentPlayers[:playerIndex]:
-                    remainingPlayers.append(other)
+                    self.actionLog.add(EventLog.CALLED, player, amountPaid)
+                player.changeChips(-amountPaid)
+                self.handPot += amountPaid
+        if betting.numActive < len(self.currentPlayers):
+            self.currentPlayers = [player for player in self.currentPlayers if self.inRound[player.seat]]
+        self.betting = None
     
     # Drawing phase where players can draw, exchange, or discard a card
     def doDrawingPhase(self):
+        self.runSteps(self.drawingPhaseSteps())
+    
+    # Steps of the drawing phase, yielding every Decision the players need to
+    # make. firstPlayer optionally continues the phase from that player's turn,
+    # skipping the players before them in the first cycle, and acted is
+    # whether anyone before them did more than Stand in that cycle.
+    def drawingPhaseSteps(self, firstPlayer = None, acted = False):
         # If all but one player has folded, skip this phase
         if len(self.currentPlayers) <= 1:
             return
         
         everyoneSkipped = False
         while not everyoneSkipped:
-            everyoneSkipped = True
+            everyoneSkipped = not (firstPlayer != None and acted)
+            self.drawActed = not everyoneSkipped
+            if self.metrics != None:
+                self.metrics.increment("drawing_cycles_total")
             for player in self.currentPlayers:
-                Game.changePlayerTo(player.getName())
+                if firstPlayer != None:
+                    if player != firstPlayer:
+                        continue
+                    firstPlayer = None
+                self.drawSeat = player.seat
+                yield Decision.startTurn(player)
                 self.printCurrentGameState(player)
                 
-                menu = ["Stand", "Draw"]
+                menu = ["Stand"]
                 cardsInHand = len(player.getHand()) > 0
                 cardsInIF = len(player.getInterferenceField()) > 0
+                cardsInDeck = self.deck.getDeckSize() > 0
                 
-                if cardsInHand:
+                # Can only draw or exchange if there are cards left to draw
+                if cardsInDeck:
+                    menu.append("Draw")
+                
+                if cardsInHand and cardsInDeck:
                     menu.append("Exchange")
+                
+                if cardsInHand:
                     menu.append("Insert into IF")
                 
                 if cardsInIF:
@@ -299,76 +422,75 @@ class Game:
                 if cardsInHand and cardsInIF:
                     menu.append("Swap from IF")
                 
-                choice = Game.printMenu("DRAW PHASE", menu)
+                choice = menu[(yield Decision.choose(player, Decider.DRAW_MENU, menu)) - 1]
                 
                 if choice == "Draw":
                     # Draw
                     self.drawCardForPlayer(player)
-                    self.actionLog.append(player.getName() + " drew a card.")
+                    self.actionLog.add(EventLog.DREW, player)
                 if choice == "Exchange":
                     # Exchange
-                    cardChoice = Game.printMenu("Choose a Card From Hand", player.getHand(), indexOnly=True)
+                    cardChoice = yield Decision.choose(player, Decider.HAND_CARD_MENU, player.getHand())
                     discardedCard = player.removeCardAtHandIndex(cardChoice - 1)
                     self.drawCardForPlayer(player)
                     # Shuffle the card back into the deck
-                    self.deck.addCard(discardedCard)
-                    self.deck.shuffle()
-                    self.actionLog.append(player.getName() + " exchanged a card.")
+                    self.deck.insertRandomly(discardedCard)
+                    self.actionLog.add(EventLog.EXCHANGED, player)
                 if choice == "Insert into IF":
-                    cardChoice = Game.printMenu("Choose Card from Hand", player.getHand(), indexOnly=True)
+                    cardChoice = yield Decision.choose(player, Decider.HAND_CARD_MENU, player.getHand())
                     discardedCard = player.removeCardAtHandIndex(cardChoice - 1)
                     player.addToInterferenceField(discardedCard)
-                    self.actionLog.append(player.getName() + " put a card into their interference field.")
+                    self.actionLog.add(EventLog.INSERTED_INTO_IF, player)
                 if choice == "Remove from IF":
-                    cardChoice = Game.printMenu("Choose Card from Interference Field", player.getInterferenceField(), indexOnly=True)
+                    cardChoice = yield Decision.choose(player, Decider.IF_CARD_MENU, player.getInterferenceField())
                     discardedCard = player.removeCardInInterferenceField(cardChoice - 1)
                     player.addToHand(discardedCard)
-                    self.actionLog.append(player.getName() + " removed a card from their interference field.")
+                    self.actionLog.add(EventLog.REMOVED_FROM_IF, player)
                 if choice == "Swap from IF":
-                    handChoice = Game.printMenu("Choose Card from Hand", player.getHand(), indexOnly=True)
-                    IFChoice = Game.printMenu("Choose Card from Interference Field", player.getInterferenceField(), indexOnly=True)
+                    handChoice = yield Decision.choose(player, Decider.HAND_CARD_MENU, player.getHand())
+                    IFChoice = yield Decision.choose(player, Decider.IF_CARD_MENU, player.getInterferenceField())
                     handCard = player.removeCardAtHandIndex(handChoice - 1)
                     IFCard = player.removeCardInInterferenceField(IFChoice - 1)
                     player.addToHand(IFCard)
                     player.addToInterferenceField(handCard)
-                    self.actionLog.append(player.getName() + " swapped a card from their interference field.")
+                    self.actionLog.add(EventLog.SWAPPED_WITH_IF, player)
                 if choice == "Stand":
-                    self.actionLog.append(player.getName() + " stood.")
+                    self.actionLog.add(EventLog.STOOD, player)
                 
                 if choice != "Stand":
                     everyoneSkipped = False
-                    # Allow player to view their hand again
-                    player.printHand()
-                    input("Press Enter to continue...")
+                    self.drawActed = True
+                    yield Decision.endTurn(player)
                 self.attemptShift()
+        self.drawSeat = None
+    
+    # Steps of the rest of the drawing phase, starting with the turn of the
+    # player in drawSeat. Used to continue a phase that was saved or copied
+    # partway through.
+    def continueDrawingSteps(self):
+        for player in self.currentPlayers:
+            if player.seat == self.drawSeat:
+                return self.drawingPhaseSteps(player, self.drawActed)
+        return self.drawingPhaseSteps()
     
     # Resolves the round and determines the winner
     def resolveRound(self):
-        self.actionLog = []
+        self.actionLog.clear()
         maxMagnitude = -1   # Tracks the current maximum magnitude
         winningPlayers = [] # Tracks all players that have value equal to
                             # current maximum magnitude
         
         for player in self.currentPlayers:
-            # Calculate hand value
-            handValue = player.calculateHandValue()
+            # Look up the hand's category and value. A Sabaac is given an
+            # absurdly high value, and Idiot's Array trumps pure Sabaac.
+            total = player.getTotal()
+            category, handValue = Game.CLASSIFIER.classify(total, player.getCardMask())
+            self.actionLog.add(Game.CATEGORY_EVENTS[category], player, abs(total))
             
             # If player bombs out, they cannot win
-            if handValue > Game.SABAAC_VALUE:
-                self.actionLog.append(player.getName() + " bombed out with a hand value of " + str(handValue))
+            if category == HandClassifier.BOMB_OUT:
                 continue
             
-            # If player has a Sabaac, assign them an absurdly high value
-            if self.isIdiotsArray(player.getHand(), player.getInterferenceField()):
-                # Idiot's Array trumps pure Sabaac
-                handValue = Game.IDIOTS_ARRAY_VALUE
-                self.actionLog.append(player.getName() + " got an Idiot's Array!")
-            elif handValue == Game.SABAAC_VALUE:
-                handValue = Game.PURE_SABAAC_VALUE
-                self.actionLog.append(player.getName() + " got a Pure Sabaac!")
-            else:
-                self.actionLog.append(player.getName() + " has a hand value of " + str(handValue))
-            
             if handValue > maxMagnitude:
                 # New maximum magnitude found, reset the list and update max
                 maxMagnitude = handValue
@@ -381,10 +503,10 @@ class Game:
             # It's a tie, hand pot goes to sabaac pot instead
             if maxMagnitude >= Game.PURE_SABAAC_VALUE:
                 # Multiple Sabaacs, somehow? Lmao have fun losing
-                self.actionLog.append("It's a tie between Sabaac winners, no one wins the sabaac pot")
+                self.actionLog.add(EventLog.SABAAC_TIE)
             else:
-                print("It's a tie!")
-            self.actionLog.append(self.handPot + " chips are lost to the Sabaac pot")
+                self.actionLog.add(EventLog.TIE)
+            self.actionLog.add(EventLog.LOST_TO_SABAAC_POT, amount=self.handPot)
             self.sabaacPot += self.handPot
         else:
             # Only one winner, award them the hand pot
@@ -394,133 +516,126 @@ class Game:
             
             # If they also got a Sabaac, give them the Sabaac pot too
             if maxMagnitude >= Game.PURE_SABAAC_VALUE:
-                self.actionLog.append(winningPlayer.getName() +  " WINS THE SABAAC POT!")
+                self.actionLog.add(EventLog.WON_SABAAC_POT, winningPlayer)
                 winningPlayer.changeChips(self.sabaacPot)
                 self.sabaacPot = 0
             else:
-                self.actionLog.append(winningPlayer.getName() + " wins!")
+                self.actionLog.add(EventLog.WON, winningPlayer)
                 
+    # Returns True if the cards in the hand and Interference Field make an
+    # Idiot's Array
     def isIdiotsArray(self, hand, IF):
-        hasIdiot = False
-        has2 = False
-        has3 = False
-        
-        for card in hand:
-            if card.getValue() == 0:
-                hasIdiot = True
-            elif card.getValue() == 2:
-                has2 = True
-            elif card.getValue() == 2:
-                has3 = True
-                
-        for card in IF:
-            if card.getValue() == 0:
-                hasIdiot = True
-            elif card.getValue() == 2:
-                has2 = True
-            elif card.getValue() == 2:
-                has3 = True
-        
-        return hasIdiot and has2 and has3
+        return HandClassifier.isIdiotsArray(HandClassifier.getMask(hand) | HandClassifier.getMask(IF))
     
     # Asks each player if they want to continue
     def confirmPlayAgain(self):
-        allPlayers = [player for player in self.playerList]
+        self.runSteps(self.playAgainSteps())
+    
+    # Steps of asking each player if they want to continue. The seats of
+    # players who quit are collected, and they're all removed from playerList
+    # at the end.
+    def playAgainSteps(self):
+        quitSeats = set()
         
-        for player in allPlayers:
-            Game.changePlayerTo(player.getName())
-            print("===", player.getName() + "'s Turn", "===")
-            print("Round Results:")
-            for line in self.actionLog:
-                print("* " + line)
-            result = Game.printMenu("PLAY AGAIN?", ["Yes", "No"])
+        for player in self.playerList:
+            yield Decision.startTurn(player)
+            if not self.headless:
+                lines = ["=== " + player.getName() + "'s Turn ===", "Round Results:"]
+                for line in self.actionLog.getLines():
+                    lines.append("* " + line)
+                self.renderer.drawLines(lines)
+            options = ["Yes", "No"]
+            result = options[(yield Decision.choose(player, Decider.PLAY_AGAIN_MENU, options)) - 1]
             
             # Do nothing if they choose to continue
             if result == "No":
                 # Player quits
-                self.playerList.remove(player)
+                quitSeats.add(player.seat)
                 
                 # If there's only one player left, end early
-                if len(self.playerList) <= 1:
-                    return
+                if len(self.playerList) - len(quitSeats) <= 1:
+                    break
+        
+        if len(quitSeats) > 0:
+            self.playerList[:] = [player for player in self.playerList if player.seat not in quitSeats]
     
     # Has a SHIFT_CHANCE chance to shift
     def attemptShift(self):
         if len(self.currentPlayers) <= 1:
             return
-        if random.random() < Game.SHIFT_CHANCE:
+        shifted = self.rng.random() < Game.SHIFT_CHANCE
+        if self.metrics != None:
+            labels = (("phase", Game.PHASE_NAMES[self.phase]),)
+            self.metrics.increment("shift_attempts_total", labels)
+            if shifted:
+                self.metrics.increment("shifts_total", labels)
+        if shifted:
             self.shift()
     
+    # Shuffles all cards in the hands of players still in the round and deals
+    # them back out, so each player keeps the same number of cards. The cards
+    # are gathered into one list, permuted in place, and each player's new
+    # hand is the next slice of it.
     def shift(self):
         cardList = []
-        playerHandSizes = {}
-        
-        # Gather all cards from hands
         for player in self.currentPlayers:
-            playerHandSizes[player.getName()] = len(player.getHand())
-            for card in player.getHand():
-                cardList.append(card)
-            player.emptyHand()
-            
-        random.shuffle(cardList)
+            cardList += player.getHand()
+        
+        self.rng.shuffle(cardList)
         
         # Redistribute
+        start = 0
         for player in self.currentPlayers:
-            numCards = playerHandSizes[player.getName()]
-            for i in range(numCards):
-                player.addToHand(cardList.pop(0))
+            end = start + len(player.getHand())
+            player.setHand(cardList[start:end])
+            start = end
                 
-        self.actionLog.append("CARDS SHIFTED!")
+        self.actionLog.add(EventLog.SHIFTED)
     
     # Draws a card from the deck and adds it to the player's hand
     def drawCardForPlayer(self, player):
        nextCard = self.deck.draw()
        player.addToHand(nextCard)
     
-    # Prints the current state of the game to the player
-    def printCurrentGameState(self, player):
-        print("===", player.getName() + "'s Turn", "===")
-        print("Action Log:")
-        for line in self.actionLog:
-            print("* " + line)
-        print()
-        print("Hand Pot:", self.handPot, "| Sabaac Pot:", self.sabaacPot)
-        print("Other Players:")
+    # Prints the current state of the game to the player, followed by any
+    # extra lines
+    def printCurrentGameState(self, player, extraLines = ()):
+        if self.headless:
+            return
+        self.renderer.drawLines(self.getGameStateLines(player) + list(extraLines))
+    
+    # Returns the lines printed by printCurrentGameState
+    def getGameStateLines(self, player):
+        lines = ["=== " + player.getName() + "'s Turn ===", "Action Log:"]
+        for line in self.actionLog.getLines():
+            lines.append("* " + line)
+        lines.append("")
+        lines.append("Hand Pot: " + str(self.handPot) + " | Sabaac Pot: " + str(self.sabaacPot))
+        lines.append("Other Players:")
         for otherPlayer in self.playerList:
-            if otherPlayer in self.currentPlayers:
+            if self.inRound[otherPlayer.seat]:
                 if(player == otherPlayer):
                     continue
-                otherPlayerDisplay = "* " + otherPlayer.getName() + " is still in the game. "
-                otherPlayerDisplay += "(" + str(otherPlayer.getChips()) + ") "
-                otherPlayerDisplay += "("
-                
-                for card in otherPlayer.getHand():
-                    otherPlayerDisplay += "X, "
-                if len(otherPlayer.getHand()) > 0:
-                    if len(otherPlayer.getInterferenceField()) <= 0:
-                        otherPlayerDisplay = otherPlayerDisplay[:-2]
-                    
-                for card in otherPlayer.getInterferenceField():
-                    otherPlayerDisplay += str(card) + ", "
-                if len(otherPlayer.getInterferenceField()) > 0:
-                    otherPlayerDisplay = otherPlayerDisplay[:-2]
-                
-                otherPlayerDisplay += ")"
+                # Hand cards are face-down, Interference Field cards face-up
+                cards = ["X"] * len(otherPlayer.getHand())
+                cards += [str(card) for card in otherPlayer.getInterferenceField()]
+                lines.append("* " + otherPlayer.getName() + " is still in the game. (" + str(otherPlayer.getChips()) + ") (" + ", ".join(cards) + ")")
             else:
-                otherPlayerDisplay = "* " + otherPlayer.getName() + " has folded. "
-                otherPlayerDisplay += "(" + str(otherPlayer.getChips()) + ")"
-            print(otherPlayerDisplay)
-        print()
-        print("Chips:", player.getChips())
-        print()
-        print("Your Hand (Total = " + str(player.calculateHandValue()) + "):")
-        player.printHand("* ")
+                lines.append("* " + otherPlayer.getName() + " has folded. (" + str(otherPlayer.getChips()) + ")")
+        lines.append("")
+        lines.append("Chips: " + str(player.getChips()))
+        lines.append("")
+        lines.append("Your Hand (Total = " + str(player.calculateHandValue()) + "):")
+        lines += player.getHandLines("* ")
+        return lines
     
 def main():
     numPlayers = int(input("Please enter the number of players: "))
-    if numPlayers < 2 or numPlayers > Game.MAX_PLAYERS:
+    if numPlayers < 2 or numPlayers > Game.MAX_PLAYERS * Game.MAX_DECKS:
         print("Number not valid, setting to default of 2.");
         numPlayers = 2
+    if numPlayers > Game.MAX_PLAYERS:
+        print("Playing with", Game.getNumDecks(numPlayers), "decks shuffled together.")
     
     players = []
     for i in range(numPlayers):
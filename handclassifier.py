@@ -0,0 +1,97 @@
+from deck import Deck
+
+# Returns a bitmask with the bit of every card with the given value set
+def getValueMask(value):
+    mask = 0
+    for card in Deck.CARDS:
+        if card.getValue() == value:
+            mask |= 1 << card.getId()
+    return mask
+
+"""
+HandClassifier class that classifies hands using precomputed lookup tables.
+A hand is described by its total (the sum of its card values) and a bitmask
+of its cards, where bit i is set if the card with id i is in the hand (see
+Deck.CARDS). Both are kept up to date by Player, so classifying a hand is a
+few bitwise operations and one table lookup.
+"""
+class HandClassifier:
+    # Hand categories
+    BOMB_OUT = 0
+    PLAIN = 1
+    PURE_SABAAC = 2
+    IDIOTS_ARRAY = 3
+
+    # Masks of the cards that make up an Idiot's Array
+    IDIOT_MASK = getValueMask(0)
+    TWO_MASK = getValueMask(2)
+    THREE_MASK = getValueMask(3)
+
+    # Lowest and highest hand totals in the tables, the totals of every
+    # negative or positive card in one deck. Anything beyond them (possible
+    # with several decks) bombs out just the same, so it's clamped to them.
+    MIN_TOTAL = sum(card.getValue() for card in Deck.CARDS if card.getValue() < 0)
+    MAX_TOTAL = sum(card.getValue() for card in Deck.CARDS if card.getValue() > 0)
+
+    # Returns the bitmask of the given cards
+    @staticmethod
+    def getMask(cards):
+        mask = 0
+        for card in cards:
+            mask |= 1 << card.getId()
+        return mask
+
+    # Returns True if the bitmask has the Idiot, a 2 and a 3
+    @staticmethod
+    def isIdiotsArray(mask):
+        return (mask & HandClassifier.IDIOT_MASK) != 0 and (mask & HandClassifier.TWO_MASK) != 0 and (mask & HandClassifier.THREE_MASK) != 0
+
+    # Constructor that builds the lookup tables for the given Sabaac value and
+    # the scores given to Pure Sabaac and Idiot's Array
+    def __init__(self, sabaacValue, pureSabaacValue, idiotsArrayValue):
+        # Tables of (category, score) pairs indexed by (total - MIN_TOTAL),
+        # for hands without and with an Idiot's Array
+        self.tables = ([], [])
+        for total in range(HandClassifier.MIN_TOTAL, HandClassifier.MAX_TOTAL + 1):
+            handValue = abs(total)
+            for hasIdiotsArray in (0, 1):
+                # Bombing out is checked first, so it beats an Idiot's Array
+                if handValue > sabaacValue:
+                    result = (HandClassifier.BOMB_OUT, -1)
+                elif hasIdiotsArray:
+                    result = (HandClassifier.IDIOTS_ARRAY, idiotsArrayValue)
+                elif handValue == sabaacValue:
+                    result = (HandClassifier.PURE_SABAAC, pureSabaacValue)
+                else:
+                    result = (HandClassifier.PLAIN, handValue)
+                self.tables[hasIdiotsArray].append(result)
+        self.tables = (tuple(self.tables[0]), tuple(self.tables[1]))
+
+    # Returns the (category, score) of the hand with the given total and
+    # bitmask. The score is used to rank hands: -1 if it bombs out, the Idiot's
+    # Array or Pure Sabaac score for a Sabaac, and the hand value otherwise.
+    def classify(self, total, mask):
+        if total < HandClassifier.MIN_TOTAL:
+            total = HandClassifier.MIN_TOTAL
+        elif total > HandClassifier.MAX_TOTAL:
+            total = HandClassifier.MAX_TOTAL
+        return self.tables[HandClassifier.isIdiotsArray(mask)][total - HandClassifier.MIN_TOTAL]
+
+    # Returns the category of the hand with the given total and bitmask
+    def getCategory(self, total, mask):
+        return self.classify(total, mask)[0]
+
+    # Returns the score of the hand with the given total and bitmask
+    def getScore(self, total, mask):
+        return self.classify(total, mask)[1]
+
+def main():
+    classifier = HandClassifier(23, 999, 1000)
+    hands = [(Deck.CARDS[1], Deck.CARDS[2], Deck.CARDS[74]), (Deck.CARDS[14], Deck.CARDS[7]), (Deck.CARDS[14], Deck.CARDS[9])]
+    for hand in hands:
+        total = sum(card.getValue() for card in hand)
+        mask = HandClassifier.getMask(hand)
+        print(", ".join(str(card) for card in hand), "->", classifier.getCategory(total, mask), classifier.getScore(total, mask))
+
+if __name__ == "__main__":
+    main()
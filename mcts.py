@@ -0,0 +1,278 @@
+from decider import Decider, ThresholdDecider
+from deck import Deck
+from game import Game
+import math
+import random
+import time
+
+"""
+SearchNode class that holds the statistics of one of the searching player's
+choices in the search tree. Children are keyed by the choice made next.
+"""
+class SearchNode:
+    def __init__(self):
+        self.children = {}      # Choice key -> SearchNode
+        self.visits = 0
+        self.availability = 0   # Number of times this choice could have been made
+        self.totalReward = 0.0
+
+    # Returns the child with the given key, creating it if needed
+    def getChild(self, key):
+        child = self.children.get(key)
+        if child == None:
+            child = SearchNode()
+            self.children[key] = child
+        return child
+
+"""
+Decider used to play out simulated rounds quickly: it calls unless its hand
+has bombed out, sometimes raises with a good hand, and draws until its hand
+value reaches a randomly chosen threshold.
+"""
+class RolloutDecider(Decider):
+    # Constructor with the random number generator to use
+    def __init__(self, rng):
+        self.rng = rng
+
+    def chooseIndex(self, game, player, title, options):
+        if title == Decider.BETTING_MENU:
+            # Options are always [Fold, Call/Check/All-in, (Raise)]
+            handValue = player.calculateHandValue()
+            if handValue > Game.SABAAC_VALUE and self.rng.random() < 0.5:
+                return 1
+            if handValue >= 20 and len(options) > 2 and self.rng.random() < 0.25:
+                return 3
+            return 2
+        if title == Decider.DRAW_MENU:
+            if "Draw" in options and player.calculateHandValue() < self.rng.randint(14, 20):
+                return options.index("Draw") + 1
+            return options.index("Stand") + 1
+        if title == Decider.PLAY_AGAIN_MENU:
+            return 1
+        return self.rng.randint(1, len(options))
+
+    def chooseNumber(self, game, player, title, max):
+        return self.rng.randint(1, min(max, 3))
+
+"""
+Decider that makes the searching player's choices in one simulated round,
+following the search tree while it can and then playing like a
+RolloutDecider. The choices in path are made first, so a search can start
+partway through a turn (such as picking the card to Exchange after choosing
+to Exchange).
+"""
+class SearchDecider(RolloutDecider):
+    # Constructor with the search that is running, the root of its tree and the
+    # keys of the choices already made this turn
+    def __init__(self, search, root, path):
+        super().__init__(search.rng)
+        self.search = search
+        self.node = root
+        self.path = path
+        self.pathIndex = 0
+        self.visited = [root]   # Nodes to update with the simulation's reward
+
+    def chooseIndex(self, game, player, title, options):
+        keys = [MCTSDecider.getKey(title, option) for option in options]
+        key = self.chooseKey(keys)
+        if key == None:
+            return super().chooseIndex(game, player, title, options)
+        return keys.index(key) + 1
+
+    def chooseNumber(self, game, player, title, max):
+        amounts = MCTSDecider.getRaiseAmounts(max)
+        keys = [MCTSDecider.getKey(title, amount) for amount in amounts]
+        key = self.chooseKey(keys)
+        if key == None:
+            return super().chooseNumber(game, player, title, max)
+        return amounts[keys.index(key)]
+
+    # Returns the key of the choice to make out of the available keys, or None
+    # to play like a RolloutDecider once the simulation has left the tree
+    def chooseKey(self, keys):
+        # Repeat the choices already made this turn
+        if self.pathIndex < len(self.path):
+            key = self.path[self.pathIndex]
+            self.pathIndex += 1
+            if key in keys:
+                return key
+            self.node = None
+            return None
+        if self.node == None:
+            return None
+
+        # Expand a choice that hasn't been tried yet, then leave the tree
+        untried = [key for key in keys if key not in self.node.children]
+        for key in keys:
+            self.node.getChild(key).availability += 1
+        if len(untried) > 0:
+            key = self.search.rng.choice(untried)
+            self.visited.append(self.node.children[key])
+            self.node = None
+            return key
+
+        # Otherwise pick the choice with the best upper confidence bound, where
+        # a choice is only compared over the simulations it was available in
+        bestKey = None
+        bestBound = None
+        scale = self.search.exploration * self.search.getRewardRange()
+        for key in keys:
+            child = self.node.children[key]
+            if child.visits == 0:
+                bound = math.inf
+            else:
+                bound = child.totalReward / child.visits + scale * math.sqrt(math.log(child.availability) / child.visits)
+            if bestBound == None or bound > bestBound:
+                bestKey = key
+                bestBound = bound
+        self.node = self.node.children[bestKey]
+        self.visited.append(self.node)
+        return bestKey
+
+"""
+Decider that plays the Betting and Draw Phases using information set Monte
+Carlo tree search. For every choice it simulates the rest of the round many
+times, each time on a copy of the game where the cards it can't see (other
+players' hands and the deck) are dealt out at random and Shifts happen with
+their usual SHIFT_CHANCE, so the search can't rely on hidden information. The
+choice that ended up with the most simulations (which favours the choice that
+won the most chips) is made.
+
+Each choice is limited to timeLimit seconds and maxIterations simulations,
+whichever comes first (None for no limit on either), so bots can fill seats
+without stalling a table. With only an iteration limit and a seeded rng, the
+decider's choices are repeatable.
+"""
+class MCTSDecider(Decider):
+    # Returns the key of an option in the search tree
+    @staticmethod
+    def getKey(title, option):
+        return title + ":" + str(option)
+
+    # Returns the amounts considered when raising by at most max chips
+    @staticmethod
+    def getRaiseAmounts(max):
+        return sorted(set(amount for amount in (1, 2, 4, max // 2, max) if amount >= 1 and amount <= max))
+
+    # Constructor with the time limit per choice in seconds, the maximum
+    # simulations per choice, how much to explore choices that haven't done
+    # well, and an optional random number generator
+    def __init__(self, timeLimit = 0.25, maxIterations = None, exploration = 0.7, rng = None):
+        if timeLimit == None and maxIterations == None:
+            raise ValueError("MCTSDecider needs a time limit or a maximum number of iterations")
+        self.timeLimit = timeLimit
+        self.maxIterations = maxIterations
+        self.exploration = exploration
+        self.rng = rng if rng != None else random.Random()
+        self.path = []          # Keys of the choices made so far this turn
+        self.minReward = 0
+        self.maxReward = 0
+
+    # Returns the difference between the best and worst rewards seen, used
+    # to scale exploration to the chips at stake
+    def getRewardRange(self):
+        return max(1, self.maxReward - self.minReward)
+
+    def startTurn(self, game, player):
+        self.path = []
+
+    def chooseIndex(self, game, player, title, options):
+        if title == Decider.PLAY_AGAIN_MENU:
+            return 1
+        keys = [MCTSDecider.getKey(title, option) for option in options]
+        key = keys[0] if len(keys) == 1 else self.search(game, player, keys)
+        self.path.append(key)
+        return keys.index(key) + 1
+
+    def chooseNumber(self, game, player, title, max):
+        amounts = MCTSDecider.getRaiseAmounts(max)
+        keys = [MCTSDecider.getKey(title, amount) for amount in amounts]
+        key = keys[0] if len(keys) == 1 else self.search(game, player, keys)
+        self.path.append(key)
+        return amounts[keys.index(key)]
+
+    # Simulates the rest of the round until the budget runs out, and returns
+    # the key of the best choice out of the given keys
+    def search(self, game, player, keys):
+        root = SearchNode()
+        self.minReward = 0
+        self.maxReward = 0
+        deadline = time.perf_counter() + self.timeLimit if self.timeLimit != None else None
+        iterations = 0
+        while iterations < len(keys) or deadline == None or time.perf_counter() < deadline:
+            if self.maxIterations != None and iterations >= self.maxIterations:
+                break
+            self.simulate(game, player, root)
+            iterations += 1
+
+        bestKey = keys[0]
+        for key in keys:
+            if key in root.children and root.children[key].visits > root.children.get(bestKey, root).visits:
+                bestKey = key
+        return bestKey
+
+    # Plays out the rest of the round once on a copy of the game with the
+    # hidden cards dealt at random, and updates the tree with the result
+    def simulate(self, game, player, root):
+        searchDecider = SearchDecider(self, root, self.path)
+        rolloutDecider = RolloutDecider(self.rng)
+        deciders = [searchDecider if other == player else rolloutDecider for other in game.playerList]
+        simulation = self.determinize(game, player, deciders)
+        simulatedPlayer = simulation.playerList[game.playerList.index(player)]
+
+        # Continue the current phase from this player's turn
+        if simulation.phase == Game.DRAWING_PHASE:
+            steps = simulation.drawingPhaseSteps(simulatedPlayer)
+        else:
+            steps = simulation.continueBettingSteps()
+        simulation.runSteps(simulation.phaseSteps(simulation.phase, steps))
+
+        reward = simulatedPlayer.getChips() - player.getChips()
+        self.minReward = min(self.minReward, reward)
+        self.maxReward = max(self.maxReward, reward)
+        for node in searchDecider.visited:
+            node.visits += 1
+            node.totalReward += reward
+
+    # Returns a copy of the game where every card the player can't see is
+    # dealt out at random: other players keep the size of their hands, and the
+    # rest of the cards make up the deck. Cards are counted rather than masked,
+    # since a game with several decks has more than one of each card.
+    def determinize(self, game, player, deciders):
+        simulation = game.clone(deciders, self.rng)
+        counts = [game.numDecks] * Deck.NUM_CARDS
+        seenCards = player.getHand() + player.getInterferenceField()
+        for other in game.playerList:
+            if other != player:
+                seenCards += other.getInterferenceField()
+        for card in seenCards:
+            counts[card.getId()] -= 1
+        unseen = []
+        for cardId in Deck.CARD_IDS:
+            unseen += [cardId] * counts[cardId]
+        self.rng.shuffle(unseen)
+
+        for other in simulation.playerList:
+            if other.getSeat() == player.getSeat():
+                continue
+            handSize = len(other.getHand())
+            other.emptyHand()
+            for i in range(handSize):
+                other.addToHand(Deck.CARDS[unseen.pop()])
+        simulation.deck = Deck(self.rng)
+        simulation.deck.deckList = unseen
+        return simulation
+
+def main():
+    rng = random.Random(0)
+    deciders = [MCTSDecider(timeLimit=None, maxIterations=200, rng=random.Random(rng.random()))]
+    deciders += [ThresholdDecider() for i in range(3)]
+    game = Game(["MCTS", "Han", "Lando", "Chewie"], deciders=deciders, headless=True, rng=rng)
+    start = time.perf_counter()
+    game.playGame(maxRounds=20)
+    print("Played", game.roundsPlayed, "rounds in", round(time.perf_counter() - start, 2), "seconds")
+    for player in game.playerList + game.eliminatedPlayers:
+        print("*", player.getName() + ":", player.getChips(), "chips")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+from decider import Decision, RandomDecider
+from eventlog import EventLog
+from game import Game
+import json
+import time
+
+"""
+GameMetrics class that collects timings and counters from games it's passed
+to (see the metrics argument of Game). One GameMetrics can be shared by many
+games to add up their numbers. Every timing and counter has a name and labels,
+a tuple of (label name, value) pairs such as (("phase", "drawing"),).
+
+The following are collected:
+
+* phase_seconds: time spent running each phase, not counting the time spent
+  waiting for players to decide
+* decision_seconds: time each player took to make each choice, per phase
+* events_total: events in the action log (folds, raises, draws, etc.), per
+  phase and player
+
+Players are labelled by their seat id rather than their name, since names
+aren't unique.
+* rounds_total, drawing_cycles_total (times every player in the Draw Phase
+  got a turn), shift_attempts_total and shifts_total
+"""
+class GameMetrics:
+    # Constructor with the clock used for timings, which returns seconds
+    def __init__(self, clock = time.perf_counter):
+        self.clock = clock
+        self.counters = {}  # (name, labels) -> count
+        self.timers = {}    # (name, labels) -> [number of timings, total seconds, maximum seconds]
+
+    # Removes every timing and counter
+    def clear(self):
+        self.counters = {}
+        self.timers = {}
+
+    # Adds the amount to a counter
+    def increment(self, name, labels = (), amount = 1):
+        key = (name, labels)
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    # Adds a timing in seconds
+    def addTime(self, name, seconds, labels = ()):
+        timer = self.timers.get((name, labels))
+        if timer == None:
+            self.timers[(name, labels)] = [1, seconds, seconds]
+        else:
+            timer[0] += 1
+            timer[1] += seconds
+            if seconds > timer[2]:
+                timer[2] = seconds
+
+    # Returns where the next event will be logged in the game's action log, to
+    # pass to countEvents
+    @staticmethod
+    def getLogPosition(game):
+        return (game.actionLog.numClears, len(game.actionLog))
+
+    # Counts the events logged in the game's action log since the given
+    # position (see getLogPosition)
+    def countEvents(self, game, position, phaseName):
+        log = game.actionLog
+        numClears, start = position
+        if log.numClears != numClears:
+            # The log was cleared, so count everything in it
+            start = 0
+        for index in range(start, len(log)):
+            eventType = log.eventTypes[index]
+            if eventType == EventLog.SHIFTED:
+                # Counted by the game as shifts_total
+                continue
+            player = log.players[index]
+            seat = str(player.getSeat()) if player != None else ""
+            self.increment("events_total", (("event", EventLog.NAMES[eventType]), ("phase", phaseName), ("seat", seat)))
+
+    # Calls the function as part of the game's given phase, timing it and
+    # counting the events it logs, and returns its result
+    def timeCall(self, game, phaseName, function):
+        logPosition = GameMetrics.getLogPosition(game)
+        start = self.clock()
+        result = function()
+        self.addTime("phase_seconds", self.clock() - start, (("phase", phaseName),))
+        self.countEvents(game, logPosition, phaseName)
+        return result
+
+    # Runs the steps of the game's given phase (a generator that yields
+    # Decisions), timing the phase and each choice made in it, and counting
+    # the events it logs. Returns the phase's result.
+    def timeSteps(self, game, phaseName, steps):
+        clock = self.clock
+        logPosition = GameMetrics.getLogPosition(game)
+        phaseLabels = (("phase", phaseName),)
+        start = clock()
+        waited = 0.0
+        answer = None
+        while True:
+            try:
+                decision = steps.send(answer)
+            except StopIteration as stop:
+                result = stop.value
+                break
+            asked = clock()
+            answer = yield decision
+            seconds = clock() - asked
+            waited += seconds
+            if decision.kind == Decision.CHOOSE or decision.kind == Decision.NUMBER:
+                self.addTime("decision_seconds", seconds, phaseLabels + (("seat", str(decision.player.getSeat())),))
+        self.addTime("phase_seconds", clock() - start - waited, phaseLabels)
+        self.countEvents(game, logPosition, phaseName)
+        return result
+
+    # Returns every timing and counter as a dictionary that can be written as
+    # JSON
+    def toDict(self):
+        counters = []
+        for (name, labels), value in sorted(self.counters.items()):
+            counters.append({ "name": name, "labels": dict(labels), "value": value })
+        timers = []
+        for (name, labels), (count, total, maximum) in sorted(self.timers.items()):
+            timers.append({ "name": name, "labels": dict(labels), "count": count, "sum": total, "max": maximum })
+        return { "counters": counters, "timers": timers }
+
+    # Returns every timing and counter as JSON text
+    def toJson(self, indent = None):
+        return json.dumps(self.toDict(), indent=indent)
+
+    # Returns every timing and counter in the Prometheus text format. Timers
+    # are written as summaries (with _count and _sum) plus a _max gauge.
+    def toPrometheus(self, prefix = "sabaac_"):
+        lines = []
+        previousName = None
+        for (name, labels), value in sorted(self.counters.items()):
+            if name != previousName:
+                lines.append("# TYPE " + prefix + name + " counter")
+                previousName = name
+            lines.append(prefix + name + GameMetrics.formatLabels(labels) + " " + str(value))
+
+        previousName = None
+        for (name, labels), (count, total, maximum) in sorted(self.timers.items()):
+            if name != previousName:
+                lines.append("# TYPE " + prefix + name + " summary")
+                previousName = name
+            formattedLabels = GameMetrics.formatLabels(labels)
+            lines.append(prefix + name + "_count" + formattedLabels + " " + str(count))
+            lines.append(prefix + name + "_sum" + formattedLabels + " " + repr(total))
+        previousName = None
+        for (name, labels), (count, total, maximum) in sorted(self.timers.items()):
+            if name != previousName:
+                lines.append("# TYPE " + prefix + name + "_max gauge")
+                previousName = name
+            lines.append(prefix + name + "_max" + GameMetrics.formatLabels(labels) + " " + repr(maximum))
+        return "\n".join(lines) + "\n"
+
+    # Returns labels formatted for Prometheus, like {phase="drawing"}
+    @staticmethod
+    def formatLabels(labels):
+        if len(labels) == 0:
+            return ""
+        parts = []
+        for labelName, value in labels:
+            value = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+            parts.append(labelName + "=\"" + value + "\"")
+        return "{" + ",".join(parts) + "}"
+
+def main():
+    metrics = GameMetrics()
+    game = Game(["Han", "Lando", "Chewie"], deciders=[RandomDecider() for i in range(3)], headless=True, metrics=metrics)
+    game.playGame(20)
+    print(metrics.toPrometheus(), end="")
+
+if __name__ == "__main__":
+    main()
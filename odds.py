@@ -0,0 +1,141 @@
+from deck import Deck
+from game import Game
+from fractions import Fraction
+import math
+
+"""
+DrawOdds class that calculates the exact chances of each hand value after
+drawing more cards. Instead of going through every order the cards could be
+drawn in, it counts how many ways each card value can be drawn and combines
+(convolves) those counts one value at a time.
+
+A deck composition is a tuple with the number of cards left of each value in
+DrawOdds.VALUES.
+"""
+class DrawOdds:
+    # Every distinct card value, in order
+    VALUES = tuple(sorted(set(card.getValue() for card in Deck.CARDS)))
+
+    # Index of each value in VALUES
+    VALUE_INDEX = { value: index for index, value in enumerate(VALUES) }
+
+    # Cache of sum distributions, keyed by (composition key, number of draws),
+    # from least to most recently used. Once it holds MAX_CACHE_SIZE entries,
+    # the least recently used one is dropped for each new one.
+    cache = {}
+    MAX_CACHE_SIZE = 4096
+
+    # Returns the composition of numDecks full decks shuffled together
+    @staticmethod
+    def fullComposition(numDecks = 1):
+        return tuple(count * numDecks for count in DrawOdds.getComposition(Deck.CARDS))
+
+    # Returns the composition of the given cards
+    @staticmethod
+    def getComposition(cards):
+        counts = [0] * len(DrawOdds.VALUES)
+        for card in cards:
+            counts[DrawOdds.VALUE_INDEX[card.getValue()]] += 1
+        return tuple(counts)
+
+    # Returns the composition of the cards left in the given Deck
+    @staticmethod
+    def getDeckComposition(deck):
+        return DrawOdds.getComposition(Deck.getCard(cardId) for cardId in deck.getDeckList())
+
+    # Returns the composition of every card that isn't in the given list of
+    # seen cards (for example, a player's hand and every Interference Field),
+    # out of numDecks full decks
+    @staticmethod
+    def getUnseenComposition(seenCards, numDecks = 1):
+        counts = list(DrawOdds.fullComposition(numDecks))
+        for card in seenCards:
+            counts[DrawOdds.VALUE_INDEX[card.getValue()]] -= 1
+        return tuple(counts)
+
+    # Returns a compact key for a composition, with each count in a byte. No
+    # value appears more than 4 times in a deck, so this fits up to 63 decks
+    # shuffled together.
+    @staticmethod
+    def compositionKey(composition):
+        key = 0
+        for count in composition:
+            if count > 0xFF:
+                raise ValueError("Too many cards of one value for a composition key: " + str(count))
+            key = (key << 8) | count
+        return key
+
+    # Returns a dictionary from each possible sum of numDraws cards drawn from
+    # the composition to the number of ways to draw it. Results are cached.
+    @staticmethod
+    def countSums(composition, numDraws):
+        cache = DrawOdds.cache
+        cacheKey = (DrawOdds.compositionKey(composition), numDraws)
+        if cacheKey in cache:
+            # Move it to the end, as the most recently used
+            sums = cache.pop(cacheKey)
+            cache[cacheKey] = sums
+            return sums
+
+        # ways[n] maps each sum to the number of ways to draw n cards with
+        # that sum, using the values combined so far
+        ways = [{} for n in range(numDraws + 1)]
+        ways[0][0] = 1
+        for index in range(len(DrawOdds.VALUES)):
+            value = DrawOdds.VALUES[index]
+            count = composition[index]
+            if count <= 0:
+                continue
+
+            newWays = [dict(sums) for sums in ways]
+            # Draw j cards of this value (j >= 1), in math.comb(count, j) ways
+            for j in range(1, min(count, numDraws) + 1):
+                choices = math.comb(count, j)
+                for n in range(numDraws - j + 1):
+                    for total, numWays in ways[n].items():
+                        newTotal = total + j * value
+                        newWays[n + j][newTotal] = newWays[n + j].get(newTotal, 0) + numWays * choices
+            ways = newWays
+
+        if len(cache) >= DrawOdds.MAX_CACHE_SIZE:
+            del cache[next(iter(cache))]
+        cache[cacheKey] = ways[numDraws]
+        return ways[numDraws]
+
+    # Returns a dictionary from each hand value (the absolute value of the
+    # hand's total) to its exact chance (as a Fraction) after drawing numDraws
+    # more cards from the composition, given the hand's current total. Raises
+    # ValueError if there aren't numDraws cards left to draw.
+    @staticmethod
+    def handValueDistribution(handTotal, composition, numDraws):
+        numCards = sum(composition)
+        if numDraws > numCards:
+            raise ValueError("Can't draw " + str(numDraws) + " cards with " + str(numCards) + " left")
+
+        totalWays = math.comb(numCards, numDraws)
+        distribution = {}
+        for total, numWays in DrawOdds.countSums(composition, numDraws).items():
+            handValue = abs(handTotal + total)
+            distribution[handValue] = distribution.get(handValue, 0) + numWays
+        return { handValue: Fraction(numWays, totalWays) for handValue, numWays in sorted(distribution.items()) }
+
+    # Returns the exact chance of bombing out (going above the given limit,
+    # Sabaac by default) after drawing numDraws more cards from the composition
+    @staticmethod
+    def bombOutChance(handTotal, composition, numDraws, limit = Game.SABAAC_VALUE):
+        distribution = DrawOdds.handValueDistribution(handTotal, composition, numDraws)
+        return sum((chance for handValue, chance in distribution.items() if handValue > limit), Fraction(0))
+
+def main():
+    deck = Deck.createDeck()
+    hand = [deck.draw(), deck.draw()]
+    handTotal = sum(card.getValue() for card in hand)
+    composition = DrawOdds.getDeckComposition(deck)
+
+    print("Hand:", ", ".join(str(card) for card in hand))
+    for numDraws in range(1, 3 + 1):
+        chance = DrawOdds.bombOutChance(handTotal, composition, numDraws)
+        print("Chance to bomb out after", numDraws, "draw(s):", format(float(chance), ".2%"))
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,43 @@
-from card import Card
+from decider import ConsoleDecider
+from deck import Deck
 
 """
 Player class that represents a player in a Sabaac game.
 """
 class Player:
-    # Constructor that creates a player with the given name
-    def __init__(self, name):
+    # Constructor that creates a player with the given name, and optionally
+    # the Decider that makes their choices (asks the console by default) and
+    # their seat id, which a Game gives each player and never changes
+    def __init__(self, name, decider = None, seat = 0):
         self.name = name
+        self.seat = seat
         self.hand = []
         self.interferenceField = []
         self.chips = 0
+        self.decider = decider if decider != None else ConsoleDecider()
+        
+        # Running totals, kept up to date as cards move so that hand values
+        # never need to be recalculated
+        self.handTotal = 0                  # Sum of card values in hand
+        self.interferenceFieldTotal = 0     # Sum of card values in the IF
+        self.handMask = 0                   # Bit i is set if a card with id i is in hand
+        self.interferenceFieldMask = 0      # Bit i is set if a card with id i is in the IF
+    
+    # Returns a copy of the player with its own hand, Interference Field and
+    # totals. Cards are shared, and so is the Decider unless one is given.
+    def clone(self, decider = None):
+        player = Player.__new__(Player)
+        player.name = self.name
+        player.seat = self.seat
+        player.hand = self.hand[:]
+        player.interferenceField = self.interferenceField[:]
+        player.chips = self.chips
+        player.decider = decider if decider != None else self.decider
+        player.handTotal = self.handTotal
+        player.interferenceFieldTotal = self.interferenceFieldTotal
+        player.handMask = self.handMask
+        player.interferenceFieldMask = self.interferenceFieldMask
+        return player
     
     # Modifies the player's chips by the given amount
     def changeChips(self, amount):
@@ -23,40 +51,67 @@ class Player:
     # Adds a card to the player's hand
     def addToHand(self, card):
         self.hand.append(card)
+        self.handTotal += card.getValue()
+        self.handMask |= 1 << card.getId()
         
     def addToInterferenceField(self, card):
         self.interferenceField.append(card)
+        self.interferenceFieldTotal += card.getValue()
+        self.interferenceFieldMask |= 1 << card.getId()
     
     # Clears the player's hand
     def emptyHand(self):
         self.hand = []
+        self.handTotal = 0
+        self.handMask = 0
+    
+    # Replaces the player's hand with the given list of cards, updating the
+    # totals in the same pass
+    def setHand(self, cards):
+        handTotal = 0
+        handMask = 0
+        for card in cards:
+            handTotal += card.getValue()
+            handMask |= 1 << card.getId()
+        self.hand = cards
+        self.handTotal = handTotal
+        self.handMask = handMask
     
     def emptyInterferenceField(self):
         self.interferenceField = []
+        self.interferenceFieldTotal = 0
+        self.interferenceFieldMask = 0
     
     # Returns the player's current hand value
     def calculateHandValue(self):
-        handValue = 0
-        for card in self.hand:
-            handValue += card.getValue()
-        for card in self.interferenceField:
-            handValue += card.getValue()
-        handValue = abs(handValue)
-        return handValue
-        
+        return abs(self.handTotal + self.interferenceFieldTotal)
+    
+    # Returns the sum of the card values in hand and IF (which may be negative)
+    def getTotal(self):
+        return self.handTotal + self.interferenceFieldTotal
+    
+    # Returns the bitmask of the cards in hand and IF
+    def getCardMask(self):
+        return self.handMask | self.interferenceFieldMask
+    
     # Prints all cards in the player's hand
     def printHand(self, prefix = ""):
-        print("In Hand: ")
+        print("\n".join(self.getHandLines(prefix)))
+    
+    # Returns the lines printed by printHand
+    def getHandLines(self, prefix = ""):
+        lines = ["In Hand: "]
         for card in self.hand:
-            print(prefix + str(card))
+            lines.append(prefix + str(card))
         if len(self.hand) <= 0:
-            print("* Empty")
-        print()
-        print("In Interference Field: ")
+            lines.append("* Empty")
+        lines.append("")
+        lines.append("In Interference Field: ")
         if len(self.interferenceField) <= 0:
-            print("* Empty")
+            lines.append("* Empty")
         for card in self.interferenceField:
-            print(prefix + str(card))
+            lines.append(prefix + str(card))
+        return lines
     
     # Returns the card at the given index
     def getCardAtHandIndex(self, index):
@@ -65,17 +120,31 @@ class Player:
     def getCardInInterferenceField(self, index):
         return self.interferenceField[index]
     
-    # Removes and returns the card at the given index
+    # Removes and returns the card at the given index. The card's bit is only
+    # cleared if no copy of it is left (a game with several decks has more
+    # than one of each card).
     def removeCardAtHandIndex(self, index):
-        return self.hand.pop(index)
+        card = self.hand.pop(index)
+        self.handTotal -= card.getValue()
+        if card not in self.hand:
+            self.handMask &= ~(1 << card.getId())
+        return card
         
     def removeCardInInterferenceField(self, index):
-        return self.interferenceField.pop(index)
+        card = self.interferenceField.pop(index)
+        self.interferenceFieldTotal -= card.getValue()
+        if card not in self.interferenceField:
+            self.interferenceFieldMask &= ~(1 << card.getId())
+        return card
 
     # Returns the player's name
     def getName(self):
         return self.name
 
+    # Returns the player's seat id
+    def getSeat(self):
+        return self.seat
+
     # Returns the player's hand (a list of cards)
     def getHand(self):
         return self.hand
@@ -86,11 +155,15 @@ class Player:
     # Returns the player's current chips
     def getChips(self):
         return self.chips
+
+    # Returns the Decider that makes this player's choices
+    def getDecider(self):
+        return self.decider
         
 def main():
     player = Player("Bob")
-    player.addToHand(Card(Card.COINS, 1))
-    player.addToHand(Card(Card.STAVES, 3))
+    player.addToHand(Deck.getCard(0))   # 1 of Coins
+    player.addToHand(Deck.getCard(47))  # 3 of Staves
     player.printHand()
     
 if __name__ == "__main__":
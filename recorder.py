@@ -0,0 +1,174 @@
+from array import array
+from decider import Decider, RandomDecider, ThresholdDecider
+from game import Game
+import random
+import struct
+import sys
+
+"""
+GameRecording class that holds everything needed to replay a game exactly:
+the seed of the game's random number generator (which every shuffle and Shift
+comes from), the players, and every choice the players made, in order.
+"""
+class GameRecording:
+    MAGIC = b"SBRC"
+    VERSION = 2                 # Changes whenever the game uses its random numbers differently
+    HEADER_FORMAT = "<4sBQIB"   # Magic, version, seed, starting chips, number of players
+
+    # Constructor with the game's seed, player names and starting chips
+    def __init__(self, seed, playerNames, startingChips):
+        self.seed = seed
+        self.playerNames = list(playerNames)
+        self.startingChips = startingChips
+        self.decisions = array("I")     # Every option index or number chosen, in order
+
+    # Returns the recording as compact binary data
+    def toBytes(self):
+        data = bytearray(struct.pack(GameRecording.HEADER_FORMAT, GameRecording.MAGIC, GameRecording.VERSION,
+                                     self.seed, self.startingChips, len(self.playerNames)))
+        for name in self.playerNames:
+            encodedName = name.encode("utf-8")
+            data += struct.pack("<B", len(encodedName)) + encodedName
+
+        # Choices are almost always small, so store them in 2 bytes if possible
+        decisions = self.decisions
+        if len(decisions) > 0 and max(decisions) > 0xFFFF:
+            typeCode = b"I"
+        else:
+            typeCode = b"H"
+            decisions = array("H", decisions)
+        data += typeCode + struct.pack("<I", len(decisions))
+        if sys.byteorder == "big":
+            # Always store in little-endian order
+            decisions = array(decisions.typecode, decisions)
+            decisions.byteswap()
+        data += decisions.tobytes()
+        return bytes(data)
+
+    # Returns a GameRecording read from binary data created by toBytes()
+    @staticmethod
+    def fromBytes(data):
+        magic, version, seed, startingChips, numPlayers = struct.unpack_from(GameRecording.HEADER_FORMAT, data)
+        if magic != GameRecording.MAGIC:
+            raise ValueError("Not a Sabaac game recording")
+        if version != GameRecording.VERSION:
+            raise ValueError("Unsupported recording version " + str(version))
+        offset = struct.calcsize(GameRecording.HEADER_FORMAT)
+
+        playerNames = []
+        for i in range(numPlayers):
+            nameLength = data[offset]
+            playerNames.append(bytes(data[(offset + 1):(offset + 1 + nameLength)]).decode("utf-8"))
+            offset += 1 + nameLength
+
+        recording = GameRecording(seed, playerNames, startingChips)
+        typeCode = chr(data[offset])
+        numDecisions = struct.unpack_from("<I", data, offset + 1)[0]
+        offset += 5
+        decisions = array(typeCode)
+        decisions.frombytes(bytes(data[offset:(offset + numDecisions * decisions.itemsize)]))
+        if sys.byteorder == "big":
+            decisions.byteswap()
+        recording.decisions = array("I", decisions)
+        return recording
+
+    # Saves the recording to a file
+    def save(self, path):
+        with open(path, "wb") as file:
+            file.write(self.toBytes())
+
+    # Returns a recording loaded from a file
+    @staticmethod
+    def load(path):
+        with open(path, "rb") as file:
+            return GameRecording.fromBytes(file.read())
+
+"""
+Decider that passes every choice on to another Decider and records it.
+"""
+class RecordingDecider(Decider):
+    # Constructor with the Decider that makes the choices and the recording
+    def __init__(self, decider, recording):
+        self.decider = decider
+        self.recording = recording
+
+    def startTurn(self, game, player):
+        self.decider.startTurn(game, player)
+
+    def endTurn(self, game, player):
+        self.decider.endTurn(game, player)
+
+    def chooseIndex(self, game, player, title, options):
+        choice = self.decider.chooseIndex(game, player, title, options)
+        self.recording.decisions.append(choice)
+        return choice
+
+    def chooseNumber(self, game, player, title, max):
+        choice = self.decider.chooseNumber(game, player, title, max)
+        self.recording.decisions.append(choice)
+        return choice
+
+"""
+Decider that makes the choices stored in a recording, without any prompts.
+All players in a replayed game share one ReplayDecider.
+"""
+class ReplayDecider(Decider):
+    # Constructor with the recording to replay
+    def __init__(self, recording):
+        self.recording = recording
+        self.position = 0
+
+    # Returns the next recorded choice
+    def nextDecision(self):
+        if self.position >= len(self.recording.decisions):
+            raise ValueError("Recording has no more choices to replay")
+        choice = self.recording.decisions[self.position]
+        self.position += 1
+        return choice
+
+    def chooseIndex(self, game, player, title, options):
+        return self.nextDecision()
+
+    def chooseNumber(self, game, player, title, max):
+        return self.nextDecision()
+
+"""
+Recorder class with helpers to create recorded games and replay them.
+"""
+class Recorder:
+    # Returns a (game, recording) pair for a new game whose choices and random
+    # numbers are recorded. If no seed is given, a random one is picked.
+    @staticmethod
+    def createGame(playerNames, deciders = None, startingChips = 30, seed = None, headless = False):
+        if seed == None:
+            seed = random.SystemRandom().getrandbits(64)
+        recording = GameRecording(seed, playerNames, startingChips)
+
+        game = Game(playerNames, startingChips, None, headless, random.Random(seed))
+        for i in range(len(game.playerList)):
+            player = game.playerList[i]
+            decider = deciders[i] if deciders != None else player.getDecider()
+            player.decider = RecordingDecider(decider, recording)
+        return game, recording
+
+    # Returns a headless game that replays the recording when played
+    @staticmethod
+    def replayGame(recording, headless = True):
+        replayDecider = ReplayDecider(recording)
+        deciders = [replayDecider] * len(recording.playerNames)
+        return Game(recording.playerNames, recording.startingChips, deciders, headless, random.Random(recording.seed))
+
+def main():
+    names = ["Han", "Lando", "Chewie"]
+    deciders = [RandomDecider(), ThresholdDecider(), RandomDecider()]
+    game, recording = Recorder.createGame(names, deciders, headless=True)
+    game.playGame(100)
+    data = recording.toBytes()
+    print("Recorded", game.roundsPlayed, "rounds and", len(recording.decisions), "choices in", len(data), "bytes")
+
+    replay = Recorder.replayGame(GameRecording.fromBytes(data))
+    replay.playGame(100)
+    print("Replay matches:", [p.getChips() for p in replay.playerList] == [p.getChips() for p in game.playerList])
+
+if __name__ == "__main__":
+    main()
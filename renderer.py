@@ -0,0 +1,77 @@
+import shutil
+import sys
+
+"""
+TerminalRenderer class that draws whole frames (lists of lines) to the
+terminal. Each frame is built into one buffer and written at once, using ANSI
+escape codes to move the cursor. Only lines that changed since the previous
+frame are redrawn, and anything printed below the previous frame (like menus)
+is cleared.
+"""
+class TerminalRenderer:
+    CLEAR_SCREEN = "\x1b[2J\x1b[3J\x1b[H"   # Clear the screen and scrollback, then move home
+    CLEAR_LINE_END = "\x1b[K"               # Clear from the cursor to the end of the line
+    CLEAR_BELOW = "\x1b[J"                  # Clear from the cursor to the end of the screen
+    RESERVED_ROWS = 12                      # Rows kept free below a frame for menus and prompts
+
+    # Returns the ANSI code that moves the cursor to the start of the given row
+    # (indexed at 1)
+    @staticmethod
+    def moveToRow(row):
+        return "\x1b[" + str(row) + ";1H"
+
+    # Constructor with the stream to write to (standard output by default)
+    def __init__(self, stream = None):
+        self.stream = stream if stream != None else sys.stdout
+        self.previousLines = None   # Lines of the previous frame, or None if unknown
+
+    # Clears the screen, so the next frame is drawn in full
+    def clear(self):
+        self.write(TerminalRenderer.CLEAR_SCREEN)
+        self.previousLines = []
+
+    # Forgets the previous frame, so the next frame clears and redraws the
+    # whole screen (used after text printed below the frame may have scrolled
+    # the terminal)
+    def invalidate(self):
+        self.previousLines = None
+
+    # Draws a frame, redrawing only the lines that changed
+    def drawLines(self, lines):
+        buffer = []
+        maxRows = shutil.get_terminal_size().lines
+        if self.previousLines == None or len(lines) + TerminalRenderer.RESERVED_ROWS > maxRows:
+            # Redraw everything if the previous frame is unknown, or if the
+            # frame and its menus could scroll the terminal (which would move
+            # the previous frame's lines)
+            if self.previousLines != []:
+                buffer.append(TerminalRenderer.CLEAR_SCREEN)
+            else:
+                buffer.append(TerminalRenderer.moveToRow(1))
+            buffer.append("\n".join(lines))
+            buffer.append("\n")
+        else:
+            for row in range(len(lines)):
+                line = lines[row]
+                if row >= len(self.previousLines) or self.previousLines[row] != line:
+                    buffer.append(TerminalRenderer.moveToRow(row + 1) + line + TerminalRenderer.CLEAR_LINE_END)
+            buffer.append(TerminalRenderer.moveToRow(len(lines) + 1))
+
+        # Clear whatever was below the frame
+        buffer.append(TerminalRenderer.CLEAR_BELOW)
+        self.write("".join(buffer))
+        self.previousLines = list(lines)
+
+    # Writes text to the stream all at once
+    def write(self, text):
+        self.stream.write(text)
+        self.stream.flush()
+
+def main():
+    renderer = TerminalRenderer()
+    renderer.clear()
+    renderer.drawLines(["Hand Pot: 4", "Sabaac Pot: 8", "Chips: 26"])
+    renderer.drawLines(["Hand Pot: 6", "Sabaac Pot: 8", "Chips: 24"])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,378 @@
+from array import array
+from decider import Decider, Decision, RandomDecider
+from eventlog import EventLog
+from game import Game
+import mmap
+import os
+import random
+import struct
+import sys
+
+"""
+ColumnWriter class that appends rows to a columnar binary file, a chunk at a
+time. Rows are buffered in one array per column and written out as a chunk
+once chunkRows rows have built up, so memory use stays bounded however many
+rows are written. All data is little-endian:
+
+* Header: magic "SBCF", version (1 byte), number of columns (1 byte), then for
+  each column its array type code (1 byte), name length (1 byte) and UTF-8
+  name, padded with zeros to a multiple of 8 bytes
+* Chunks: magic "SBCK" and the number of rows (4 bytes), then each column's
+  values in turn, each padded with zeros to a multiple of 8 bytes
+
+The file is only ever appended to. Opening an existing file checks that it has
+the same columns and drops a chunk left half-written by a crash, so writing
+can pick up where it left off.
+"""
+class ColumnWriter:
+    MAGIC = b"SBCF"
+    VERSION = 1
+    CHUNK_MAGIC = b"SBCK"
+    CHUNK_HEADER = struct.Struct("<4sI")
+    TYPE_CODES = ("b", "B", "h", "H", "i", "I", "q", "Q", "d")  # Array type codes with the same size on every platform
+
+    # Constructor with the file's path and its columns as (name, array type
+    # code) pairs, like ("seat", "h")
+    def __init__(self, path, columns, chunkRows = 65536):
+        self.columns = [ (name, typeCode) for name, typeCode in columns ]
+        for name, typeCode in self.columns:
+            if typeCode not in ColumnWriter.TYPE_CODES or array(typeCode).itemsize not in (1, 2, 4, 8):
+                raise ValueError("Unsupported type code " + repr(typeCode) + " for column " + name)
+        self.chunkRows = chunkRows
+        self.buffers = [ array(typeCode) for name, typeCode in self.columns ]
+        self.numRows = 0
+
+        header = ColumnWriter.packHeader(self.columns)
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with ColumnReader(path) as reader:
+                if reader.columns != self.columns:
+                    raise ValueError(path + " has different columns")
+                self.numRows = reader.numRows
+                end = reader.end
+            self.file = open(path, "r+b")
+            self.file.truncate(end)     # Drop a half-written chunk, if any
+            self.file.seek(end)
+        else:
+            self.file = open(path, "wb")
+            self.file.write(header)
+
+    # Returns the file header for the given columns
+    @staticmethod
+    def packHeader(columns):
+        data = bytearray(struct.pack("<4sBB", ColumnWriter.MAGIC, ColumnWriter.VERSION, len(columns)))
+        for name, typeCode in columns:
+            encodedName = name.encode("utf-8")
+            data += struct.pack("<cB", typeCode.encode("ascii"), len(encodedName)) + encodedName
+        data += bytes(-len(data) % 8)
+        return bytes(data)
+
+    # Adds a row, with a value for each column in order
+    def append(self, *values):
+        for buffer, value in zip(self.buffers, values):
+            buffer.append(value)
+        if len(self.buffers[0]) >= self.chunkRows:
+            self.flush()
+
+    # Writes the buffered rows to the file as a chunk
+    def flush(self):
+        numRows = len(self.buffers[0])
+        if numRows == 0:
+            return
+        self.file.write(ColumnWriter.CHUNK_HEADER.pack(ColumnWriter.CHUNK_MAGIC, numRows))
+        for buffer in self.buffers:
+            if sys.byteorder == "big":
+                # Always store in little-endian order
+                buffer.byteswap()
+            data = buffer.tobytes()
+            self.file.write(data + bytes(-len(data) % 8))
+            del buffer[:]
+        self.file.flush()
+        self.numRows += numRows
+
+    # Writes the buffered rows and closes the file
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+"""
+ColumnReader class that memory-maps a file written by a ColumnWriter. Only the
+chunk headers are read when opening; column values are read from the mapped
+file as they're used, so files far bigger than memory can be scanned chunk by
+chunk. A chunk left half-written at the end of the file is ignored.
+"""
+class ColumnReader:
+    # Constructor with the file's path
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.data = None
+        try:
+            # Check the header before mapping the file, which can't map an
+            # empty file
+            header = self.file.read(6)
+            if len(header) < 6 or header[:4] != ColumnWriter.MAGIC:
+                raise ValueError("Not a Sabaac column file")
+            magic, version, numColumns = struct.unpack("<4sBB", header)
+            if version != ColumnWriter.VERSION:
+                raise ValueError("Unsupported column file version " + str(version))
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+            self.columns = []
+            offset = 6
+            for i in range(numColumns):
+                typeCode = chr(self.data[offset])
+                nameLength = self.data[offset + 1]
+                self.columns.append((self.data[(offset + 2):(offset + 2 + nameLength)].decode("utf-8"), typeCode))
+                offset += 2 + nameLength
+            offset += -offset % 8
+        except Exception:
+            # Don't leave the file open if it can't be read
+            self.close()
+            raise
+        self.columnIndices = { name: index for index, (name, typeCode) in enumerate(self.columns) }
+
+        # Find where every complete chunk starts and how many rows it has
+        self.chunks = []    # (offset of the first column, number of rows) pairs
+        self.numRows = 0
+        headerSize = ColumnWriter.CHUNK_HEADER.size
+        while offset + headerSize <= len(self.data):
+            magic, numRows = ColumnWriter.CHUNK_HEADER.unpack_from(self.data, offset)
+            if magic != ColumnWriter.CHUNK_MAGIC:
+                break
+            end = offset + headerSize
+            for name, typeCode in self.columns:
+                size = numRows * array(typeCode).itemsize
+                end += size + (-size % 8)
+            if end > len(self.data):
+                break
+            self.chunks.append((offset + headerSize, numRows))
+            self.numRows += numRows
+            offset = end
+        self.end = offset   # End of the last complete chunk
+
+    # Returns the number of rows
+    def __len__(self):
+        return self.numRows
+
+    # Returns the values of the given columns (every column by default) in
+    # the chunk at the given index, as a dictionary from name to values. The
+    # values are memoryviews into the mapped file, or arrays on big-endian
+    # machines. Both can be passed to numpy.frombuffer without copying.
+    def getChunk(self, index, names = None):
+        offset, numRows = self.chunks[index]
+        wanted = set(names) if names != None else None
+        values = {}
+        for name, typeCode in self.columns:
+            size = numRows * array(typeCode).itemsize
+            if wanted == None or name in wanted:
+                view = memoryview(self.data)[offset:(offset + size)].cast(typeCode)
+                if sys.byteorder == "big":
+                    view = array(typeCode, view.tobytes())
+                    view.byteswap()
+                values[name] = view
+            offset += size + (-size % 8)
+        return values
+
+    # Returns a generator over the values of the given columns in every chunk
+    # (see getChunk)
+    def getChunks(self, names = None):
+        for index in range(len(self.chunks)):
+            yield self.getChunk(index, names)
+
+    # Returns a generator over every value in the given column
+    def getColumn(self, name):
+        if name not in self.columnIndices:
+            raise KeyError(name)
+        for chunk in self.getChunks([name]):
+            values = chunk[name]
+            yield from values
+            if isinstance(values, memoryview):
+                values.release()
+
+    # Unmaps and closes the file. Every memoryview from getChunk must have
+    # been released (or garbage collected) first.
+    def close(self):
+        if self.data != None:
+            self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+"""
+RoundExporter class that writes a record of every round and every choice made
+in games it's passed to (see the exporter argument of Game), as two column
+files. One RoundExporter can be shared by many games played one after another.
+
+Each choice made in a Betting Phase or the Draw Phase is a row of the
+decisions file:
+
+* game, round: which game (counted from 0 by this exporter) and which round of
+  that game
+* seat: the player's seat id
+* phase: the phase (Game.ANTE_BETTING_PHASE, etc.)
+* action: the EventLog event type of what they did (FOLDED, RAISED, DREW, etc.)
+* amount: chips paid into the hand pot
+* valueBefore, valueAfter: the player's hand total before choosing and at the
+  end of their turn
+* handPot, sabaacPot: the pots at the end of their turn
+* shifted: 1 if a Shift happened during their turn
+
+Each resolved round is a row of the rounds file:
+
+* game, round: as above
+* numPlayers: players still in the round when it was resolved
+* handPot, sabaacPot: the pots before the winner was paid
+* winner: the winner's seat, or -1 if there was a tie
+* winnerValue: the winner's hand total, or 0 if there was a tie
+* sabaacWon: 1 if the winner also won the Sabaac pot
+* numShifts: Shifts during the round
+"""
+class RoundExporter:
+    DECISION_COLUMNS = (
+        ("game", "I"), ("round", "I"), ("seat", "H"), ("phase", "B"), ("action", "B"), ("amount", "i"),
+        ("valueBefore", "h"), ("valueAfter", "h"), ("handPot", "i"), ("sabaacPot", "i"), ("shifted", "B"),
+    )
+    ROUND_COLUMNS = (
+        ("game", "I"), ("round", "I"), ("numPlayers", "H"), ("handPot", "i"), ("sabaacPot", "i"),
+        ("winner", "h"), ("winnerValue", "h"), ("sabaacWon", "B"), ("numShifts", "H"),
+    )
+    MENUS = (Decider.BETTING_MENU, Decider.DRAW_MENU)  # Menus whose choice starts a turn's action
+    ACTIONS = frozenset(range(EventLog.FOLDED, EventLog.SWAPPED_WITH_IF + 1))
+
+    # Constructor with the paths of the decisions and rounds files, which are
+    # appended to if they already exist
+    def __init__(self, decisionsPath, roundsPath, chunkRows = 65536):
+        self.decisions = ColumnWriter(decisionsPath, RoundExporter.DECISION_COLUMNS, chunkRows)
+        self.rounds = ColumnWriter(roundsPath, RoundExporter.ROUND_COLUMNS, chunkRows)
+        self.game = None
+        self.gameIndex = -1
+        self.turn = None    # [seat, player, phase, hand value before, action log index] of the turn being recorded
+
+    # Returns the index of the given game, counting a new game whenever a
+    # different Game is passed in
+    def getGameIndex(self, game):
+        if game is not self.game:
+            self.game = game
+            self.gameIndex += 1
+        return self.gameIndex
+
+    # Starts recording the turn of the player making a choice
+    def startTurn(self, game, phase, player):
+        self.finishTurn(game)
+        self.turn = [player.getSeat(), player, phase, player.getTotal(), len(game.actionLog)]
+
+    # Writes the turn being recorded, if any, using what was added to the
+    # action log since it started
+    def finishTurn(self, game):
+        if self.turn == None:
+            return
+        seat, player, phase, valueBefore, logStart = self.turn
+        self.turn = None
+        log = game.actionLog
+        action = 0
+        amount = 0
+        shifted = 0
+        for index in range(logStart, len(log)):
+            eventType = log.eventTypes[index]
+            if eventType == EventLog.SHIFTED:
+                shifted = 1
+            elif eventType in RoundExporter.ACTIONS and log.players[index] is player:
+                action = eventType
+                if eventType == EventLog.CALLED or eventType == EventLog.ALL_IN:
+                    amount = log.amounts[index]
+                elif eventType == EventLog.RAISED:
+                    amount = log.extras[index]
+        self.decisions.append(self.getGameIndex(game), game.roundsPlayed, seat, phase, action, amount,
+                              valueBefore, player.getTotal(), game.handPot, game.sabaacPot, shifted)
+
+    # Runs the steps of the game's given phase (a generator that yields
+    # Decisions), recording each player's choices. Returns the phase's result.
+    def exportSteps(self, game, phase, steps):
+        answer = None
+        while True:
+            try:
+                decision = steps.send(answer)
+            except StopIteration as stop:
+                self.finishTurn(game)
+                return stop.value
+            if decision.kind == Decision.CHOOSE and decision.title in RoundExporter.MENUS:
+                self.startTurn(game, phase, decision.player)
+            answer = yield decision
+
+    # Resolves the game's round and records the result
+    def exportResolve(self, game):
+        self.finishTurn(game)
+        numPlayers = len(game.currentPlayers)
+        handPot = game.handPot
+        sabaacPot = game.sabaacPot
+        numShifts = game.actionLog.count(EventLog.SHIFTED)
+        game.resolveRound()
+
+        winner = -1
+        winnerValue = 0
+        sabaacWon = 0
+        log = game.actionLog
+        for index in range(len(log)):
+            eventType = log.eventTypes[index]
+            if eventType == EventLog.WON or eventType == EventLog.WON_SABAAC_POT:
+                player = log.players[index]
+                winner = player.getSeat()
+                winnerValue = player.getTotal()
+                sabaacWon = 1 if eventType == EventLog.WON_SABAAC_POT else 0
+        self.rounds.append(self.getGameIndex(game), game.roundsPlayed, numPlayers, handPot, sabaacPot,
+                           winner, winnerValue, sabaacWon, numShifts)
+
+    # Writes the buffered rows to the files
+    def flush(self):
+        self.decisions.flush()
+        self.rounds.flush()
+
+    # Writes the buffered rows and closes the files
+    def close(self):
+        self.decisions.close()
+        self.rounds.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.close()
+
+def main():
+    decisionsPath = sys.argv[1] if len(sys.argv) > 1 else "decisions.sbcf"
+    roundsPath = sys.argv[2] if len(sys.argv) > 2 else "rounds.sbcf"
+    numGames = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+
+    # Simulate games between RandomDeciders, exporting every round
+    rng = random.Random(0)
+    names = ["Han", "Lando", "Chewie", "Leia"]
+    with RoundExporter(decisionsPath, roundsPath) as exporter:
+        for i in range(numGames):
+            deciders = [RandomDecider(random.Random(rng.random())) for name in names]
+            Game(names, deciders=deciders, headless=True, rng=random.Random(rng.random()), exporter=exporter).playGame(50)
+
+    # Scan the files a chunk at a time
+    with ColumnReader(decisionsPath) as reader:
+        counts = [0] * len(EventLog.NAMES)
+        for action in reader.getColumn("action"):
+            counts[action] += 1
+        print(len(reader), "decisions:", ", ".join(EventLog.NAMES[action] + " " + str(count)
+                                                   for action, count in enumerate(counts) if count > 0))
+    with ColumnReader(roundsPath) as reader:
+        numTies = sum(1 for winner in reader.getColumn("winner") if winner < 0)
+        numSabaacWins = sum(reader.getColumn("sabaacWon"))
+        print(len(reader), "rounds:", numTies, "ties,", numSabaacWins, "Sabaac pots won")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+from decider import Decider, Decision
+from game import Game
+import asyncio
+import json
+import sys
+import time
+
+"""
+Decider that makes the safe choice when a player doesn't answer in time or has
+disconnected: Fold when betting, Stand when drawing, and leave the game when
+asked to play again.
+"""
+class TimeoutDecider(Decider):
+    def chooseIndex(self, game, player, title, options):
+        if title == Decider.PLAY_AGAIN_MENU:
+            return options.index("No") + 1
+        for option in ("Fold", "Stand"):
+            if option in options:
+                return options.index(option) + 1
+        return 1
+
+    def chooseNumber(self, game, player, title, max):
+        return 1
+
+"""
+Seat class that represents one connected client sitting at a table. Messages
+are JSON objects, one per line.
+"""
+class Seat:
+    # Constructor with the player's name and the connection's streams
+    def __init__(self, name, reader, writer):
+        self.name = name
+        self.reader = reader
+        self.writer = writer
+        self.connected = True
+        self.nextDecisionId = 0
+        self.pendingAnswers = {}    # Decision id -> Future waiting for the answer
+
+    # Sends a message to the client
+    async def send(self, message):
+        if not self.connected:
+            return
+        try:
+            self.writer.write(json.dumps(message).encode("utf-8") + b"\n")
+            await self.writer.drain()
+        except ConnectionError:
+            self.disconnect()
+
+    # Reads answers from the client until it disconnects
+    async def readAnswers(self):
+        while self.connected:
+            try:
+                line = await self.reader.readline()
+            except (ValueError, ConnectionError):
+                # The line was longer than the StreamReader allows, or the
+                # connection was reset, so drop the client
+                self.writer.close()
+                break
+            if not line:
+                break
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(message, dict) and message.get("type") == "answer":
+                future = self.pendingAnswers.pop(message.get("id"), None)
+                if future != None and not future.done():
+                    future.set_result(message.get("value"))
+        self.disconnect()
+
+    # Marks the seat as disconnected, giving up on any pending answers
+    def disconnect(self):
+        self.connected = False
+        for future in self.pendingAnswers.values():
+            if not future.done():
+                future.set_result(None)
+        self.pendingAnswers = {}
+
+    # Sends the decision to the client and returns its answer, or None if it
+    # didn't answer within the timeout
+    async def ask(self, message, timeout):
+        if not self.connected:
+            return None
+        decisionId = self.nextDecisionId
+        self.nextDecisionId += 1
+        future = asyncio.get_running_loop().create_future()
+        self.pendingAnswers[decisionId] = future
+        message["id"] = decisionId
+        await self.send(message)
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self.pendingAnswers.pop(decisionId, None)
+
+"""
+Table class that holds a Game and the Seat of each of its players.
+"""
+class Table:
+    # Constructor with the table's number, its seats and the game's settings
+    def __init__(self, number, seats, startingChips):
+        self.number = number
+        self.seats = seats
+
+        # Names must be unique within a game
+        names = []
+        for seat in seats:
+            name = seat.name
+            while name in names:
+                name += "'"
+            names.append(name)
+        deciders = [TimeoutDecider() for seat in seats]
+        self.game = Game(names, startingChips, deciders, headless=True)
+
+        # Look up seats by player
+        self.seatsByPlayer = {}
+        for i in range(len(seats)):
+            self.seatsByPlayer[self.game.playerList[i]] = seats[i]
+
+"""
+SabaacServer class that hosts many tables at once in a single asyncio event
+loop. Clients connect over TCP and send {"type": "join", "name": ...}; once
+enough clients are waiting, they're seated at a new table. Every choice a
+player needs to make is sent as a "decision" message and awaited, so no
+threads are needed. A player who doesn't answer in time Folds or Stands.
+"""
+class SabaacServer:
+    # Constructor with the number of seats per table, the seconds each player
+    # has to answer, the chips each player starts with, and the maximum rounds
+    # per game (None for no limit)
+    def __init__(self, seatsPerTable = 2, decisionTimeout = 30.0, startingChips = 30, maxRounds = None):
+        self.seatsPerTable = seatsPerTable
+        self.decisionTimeout = decisionTimeout
+        self.startingChips = startingChips
+        self.maxRounds = maxRounds
+        self.waitingSeats = []
+        self.tableTasks = set()
+        self.numTables = 0
+        self.server = None
+
+    # Starts listening and returns the port being listened on
+    async def start(self, host = "127.0.0.1", port = 0):
+        self.server = await asyncio.start_server(self.handleClient, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    # Stops listening and cancels the tables still running, since a game with
+    # no round limit may never finish
+    async def stop(self):
+        if self.server != None:
+            self.server.close()
+            await self.server.wait_closed()
+        for task in self.tableTasks:
+            task.cancel()
+        if len(self.tableTasks) > 0:
+            await asyncio.gather(*self.tableTasks, return_exceptions=True)
+
+    # Handles a new client connection
+    async def handleClient(self, reader, writer):
+        line = await reader.readline()
+        try:
+            message = json.loads(line)
+        except ValueError:
+            message = None
+        if not isinstance(message, dict) or message.get("type") != "join":
+            writer.close()
+            return
+
+        seat = Seat(str(message.get("name", "Player")), reader, writer)
+        self.waitingSeats.append(seat)
+        if len(self.waitingSeats) >= self.seatsPerTable:
+            seats = self.waitingSeats[:self.seatsPerTable]
+            self.waitingSeats = self.waitingSeats[self.seatsPerTable:]
+            table = Table(self.numTables, seats, self.startingChips)
+            self.numTables += 1
+            task = asyncio.create_task(self.runTable(table))
+            self.tableTasks.add(task)
+            task.add_done_callback(self.tableTasks.discard)
+
+        await seat.readAnswers()
+
+        # Drop the seat if its client disconnected before being seated
+        if seat in self.waitingSeats:
+            self.waitingSeats.remove(seat)
+            writer.close()
+
+    # Plays a game at the table until it's over, or until it's cancelled
+    async def runTable(self, table):
+        game = table.game
+        try:
+            for i in range(len(table.seats)):
+                await table.seats[i].send({ "type": "seated", "table": table.number, "name": game.playerList[i].getName() })
+
+            while len(game.playerList) > 1:
+                if self.maxRounds != None and game.roundsPlayed >= self.maxRounds:
+                    break
+                steps = game.roundSteps()
+                answer = None
+                while True:
+                    try:
+                        decision = steps.send(answer)
+                    except StopIteration:
+                        break
+                    answer = await self.answerDecision(table, decision)
+
+            for player, seat in table.seatsByPlayer.items():
+                await seat.send({ "type": "gameOver", "chips": player.getChips(), "rounds": game.roundsPlayed })
+        finally:
+            for seat in table.seats:
+                seat.writer.close()
+
+    # Returns the answer to a Decision from the table's game, asking the
+    # player's client and falling back to the player's TimeoutDecider
+    async def answerDecision(self, table, decision):
+        player = decision.player
+        fallback = player.getDecider()
+        if decision.kind != Decision.CHOOSE and decision.kind != Decision.NUMBER:
+            return fallback.answer(table.game, decision)
+
+        message = { "type": "decision", "title": decision.title, "state": self.getState(table.game, player) }
+        if decision.kind == Decision.CHOOSE:
+            message["kind"] = "choose"
+            message["options"] = [str(option) for option in decision.options]
+            maxAnswer = len(decision.options)
+        else:
+            message["kind"] = "number"
+            message["max"] = decision.max
+            maxAnswer = decision.max
+
+        answer = await table.seatsByPlayer[player].ask(message, self.decisionTimeout)
+        # JSON true and false are read as bools, which Python counts as ints
+        if not isinstance(answer, int) or isinstance(answer, bool) or answer < 1 or answer > maxAnswer:
+            return fallback.answer(table.game, decision)
+        return answer
+
+    # Returns what the given player can see of the game
+    def getState(self, game, player):
+        others = []
+        for other in game.playerList:
+            if other == player:
+                continue
+            others.append({
+                "name": other.getName(),
+                "chips": other.getChips(),
+                "folded": not game.isInRound(other),
+                "handSize": len(other.getHand()),
+                "interferenceField": [str(card) for card in other.getInterferenceField()],
+            })
+        return {
+            "chips": player.getChips(),
+            "hand": [str(card) for card in player.getHand()],
+            "interferenceField": [str(card) for card in player.getInterferenceField()],
+            "handValue": player.calculateHandValue(),
+            "handPot": game.handPot,
+            "sabaacPot": game.sabaacPot,
+            "others": others,
+            "log": list(game.actionLog.getLines()),
+        }
+
+"""
+BotClient class that connects to a SabaacServer and plays a simple strategy:
+always call, draw until the hand value reaches a threshold, and keep playing.
+It's used to test the server with local clients.
+"""
+class BotClient:
+    # Constructor with the bot's name and the hand value to stand at
+    def __init__(self, name, standValue = 18):
+        self.name = name
+        self.standValue = standValue
+
+    # Returns the answer to a decision message
+    def chooseAnswer(self, message):
+        if message["kind"] == "number":
+            return 1
+        options = message["options"]
+        if message["title"] == Decider.BETTING_MENU:
+            return 2
+        if message["title"] == Decider.DRAW_MENU:
+            if message["state"]["handValue"] < self.standValue and "Draw" in options:
+                return options.index("Draw") + 1
+            return options.index("Stand") + 1
+        return 1
+
+    # Plays at the server until the game is over, returning the final chips
+    async def play(self, host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(json.dumps({ "type": "join", "name": self.name }).encode("utf-8") + b"\n")
+        await writer.drain()
+
+        chips = None
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            message = json.loads(line)
+            if message["type"] == "decision":
+                answer = { "type": "answer", "id": message["id"], "value": self.chooseAnswer(message) }
+                writer.write(json.dumps(answer).encode("utf-8") + b"\n")
+                await writer.drain()
+            elif message["type"] == "gameOver":
+                chips = message["chips"]
+        writer.close()
+        return chips
+
+# Runs many tables of bots against a local server and prints how long it took
+async def runLocalDemo(numTables = 200, seatsPerTable = 2):
+    server = SabaacServer(seatsPerTable, decisionTimeout=5.0, maxRounds=20)
+    port = await server.start()
+
+    start = time.time()
+    clients = [BotClient("Bot " + str(i)) for i in range(numTables * seatsPerTable)]
+    results = await asyncio.gather(*[client.play("127.0.0.1", port) for client in clients])
+    await server.stop()
+
+    print("Played", server.numTables, "tables with", len(results), "clients in", round(time.time() - start, 2), "seconds")
+
+async def serveForever(host, port):
+    server = SabaacServer()
+    port = await server.start(host, port)
+    print("Listening on", host + ":" + str(port))
+    await server.server.serve_forever()
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        port = int(sys.argv[2]) if len(sys.argv) > 2 else 5023
+        asyncio.run(serveForever("0.0.0.0", port))
+    else:
+        asyncio.run(runLocalDemo())
+
+if __name__ == "__main__":
+    main()
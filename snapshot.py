@@ -0,0 +1,175 @@
+from betting import BettingRound
+from decider import RandomDecider
+from deck import Deck
+from game import Game
+import struct
+
+"""
+Snapshot class that saves a Game's table state to compact binary data and
+restores it. Cards are stored as one-byte ids (see Deck.CARDS) and chips as
+4-byte unsigned integers, all little-endian:
+
+* Header: magic "SBSN", version (1 byte), hand pot, Sabaac pot, rounds played
+  (4 bytes each), number of players (2 bytes), number of decks (1 byte),
+  number of seats (2 bytes), phase (1 byte)
+* For each player in playerList: name length (1 byte, so names are at most
+  255 bytes) and UTF-8 name, seat id (2 bytes), chips (4 bytes), whether
+  they're still in the round (1 byte), then the number of cards in hand and in
+  the Interference Field (1 byte each) followed by the card ids
+* Deck: whether there is a deck (1 byte), the number of cards (2 bytes) and
+  the card ids from bottom to top
+* Betting: whether a Betting Phase is under way (1 byte). If so, the amount
+  needed to stay in (4 bytes), turns left (4 bytes, signed), whose turn it is,
+  the number of raises and the number of betting seats (2 bytes each), then
+  for each betting seat the player's seat id (2 bytes), what they've paid
+  (4 bytes) and whether they've folded (1 byte)
+* Drawing: whether a Draw Phase turn is under way (1 byte). If so, the seat id
+  of the player whose turn it is (2 bytes) and whether anyone has done more
+  than Stand earlier in the cycle (1 byte)
+
+Deciders and the random number generator aren't saved; they're given when
+restoring instead.
+"""
+class Snapshot:
+    MAGIC = b"SBSN"
+    VERSION = 1
+    HEADER = struct.Struct("<4sBIIIHBHB")
+    PLAYER = struct.Struct("<HIBBB")
+    DECK = struct.Struct("<BH")
+    BETTING = struct.Struct("<IiHHH")
+    BETTING_SEAT = struct.Struct("<HIB")
+    DRAWING = struct.Struct("<HB")
+
+    # Returns the game's state as binary data. Raises ValueError if a
+    # player's name is longer than 255 bytes.
+    @staticmethod
+    def save(game):
+        data = bytearray(Snapshot.HEADER.pack(Snapshot.MAGIC, Snapshot.VERSION, game.handPot, game.sabaacPot, game.roundsPlayed,
+                                              len(game.playerList), game.numDecks, game.numSeats, game.phase))
+        for player in game.playerList:
+            name = player.getName().encode("utf-8")
+            if len(name) > 0xFF:
+                raise ValueError("Player name is too long for a snapshot: " + player.getName())
+            hand = player.getHand()
+            interferenceField = player.getInterferenceField()
+            data.append(len(name))
+            data += name
+            data += Snapshot.PLAYER.pack(player.getSeat(), player.getChips(), game.isInRound(player), len(hand), len(interferenceField))
+            data += bytes(card.getId() for card in hand)
+            data += bytes(card.getId() for card in interferenceField)
+
+        if game.deck != None:
+            deckList = game.deck.getDeckList()
+            data += Snapshot.DECK.pack(1, len(deckList))
+            data += bytes(deckList)
+        else:
+            data += Snapshot.DECK.pack(0, 0)
+
+        betting = game.betting
+        if betting != None:
+            data.append(1)
+            data += Snapshot.BETTING.pack(betting.minCost, betting.turnsLeft, betting.seat, betting.numRaises, len(betting.players))
+            for seat in range(len(betting.players)):
+                data += Snapshot.BETTING_SEAT.pack(betting.players[seat].getSeat(), betting.getPaid(seat), betting.folded[seat])
+        else:
+            data.append(0)
+
+        if game.phase == Game.DRAWING_PHASE and game.drawSeat != None:
+            data.append(1)
+            data += Snapshot.DRAWING.pack(game.drawSeat, game.drawActed)
+        else:
+            data.append(0)
+        return bytes(data)
+
+    # Returns a Game restored from data created by save(). deciders, headless
+    # and rng are passed on to the new Game. A game saved during a Betting
+    # Phase continues it with continueBettingSteps(), and one saved at the
+    # start of a player's Draw Phase turn with continueDrawingSteps().
+    @staticmethod
+    def restore(data, deciders = None, headless = False, rng = None):
+        magic, version, handPot, sabaacPot, roundsPlayed, numPlayers, numDecks, numSeats, phase = Snapshot.HEADER.unpack_from(data)
+        if magic != Snapshot.MAGIC:
+            raise ValueError("Not a Sabaac game snapshot")
+        if version != Snapshot.VERSION:
+            raise ValueError("Unsupported snapshot version " + str(version))
+        offset = Snapshot.HEADER.size
+
+        # Read each player's name, chips and cards
+        names = []
+        playerStates = []
+        for i in range(numPlayers):
+            nameLength = data[offset]
+            names.append(bytes(data[(offset + 1):(offset + 1 + nameLength)]).decode("utf-8"))
+            offset += 1 + nameLength
+            seat, chips, inRound, handSize, fieldSize = Snapshot.PLAYER.unpack_from(data, offset)
+            offset += Snapshot.PLAYER.size
+            hand = data[offset:(offset + handSize)]
+            offset += handSize
+            interferenceField = data[offset:(offset + fieldSize)]
+            offset += fieldSize
+            playerStates.append((seat, chips, inRound, hand, interferenceField))
+
+        game = Game(names, 0, deciders, headless, rng, numDecks=numDecks)
+        game.handPot = handPot
+        game.sabaacPot = sabaacPot
+        game.roundsPlayed = roundsPlayed
+        game.phase = phase
+        game.currentPlayers = []
+        game.numSeats = numSeats
+        game.inRound = bytearray(numSeats)
+        playersBySeat = {}
+        for i in range(numPlayers):
+            player = game.playerList[i]
+            seat, chips, inRound, hand, interferenceField = playerStates[i]
+            player.seat = seat
+            playersBySeat[seat] = player
+            player.changeChips(chips)
+            for cardId in hand:
+                player.addToHand(Deck.getCard(cardId))
+            for cardId in interferenceField:
+                player.addToInterferenceField(Deck.getCard(cardId))
+            if inRound:
+                game.currentPlayers.append(player)
+                game.inRound[seat] = 1
+
+        hasDeck, deckSize = Snapshot.DECK.unpack_from(data, offset)
+        offset += Snapshot.DECK.size
+        if hasDeck:
+            game.deck = Deck(game.rng)
+            game.deck.deckList = list(data[offset:(offset + deckSize)])
+        offset += deckSize
+
+        if data[offset]:
+            minCost, turnsLeft, seat, numRaises, numBettingSeats = Snapshot.BETTING.unpack_from(data, offset + 1)
+            offset += 1 + Snapshot.BETTING.size
+            players = []
+            paid = []
+            folded = []
+            for i in range(numBettingSeats):
+                playerSeat, playerPaid, playerFolded = Snapshot.BETTING_SEAT.unpack_from(data, offset)
+                offset += Snapshot.BETTING_SEAT.size
+                players.append(playersBySeat[playerSeat])
+                paid.append(playerPaid)
+                folded.append(playerFolded)
+            game.betting = BettingRound.fromState(players, minCost, paid, folded, seat, turnsLeft, numRaises)
+        else:
+            offset += 1
+
+        if data[offset]:
+            game.drawSeat, drawActed = Snapshot.DRAWING.unpack_from(data, offset + 1)
+            game.drawActed = drawActed != 0
+        return game
+
+def main():
+    game = Game(["Han", "Lando", "Chewie"], deciders=[RandomDecider() for i in range(3)], headless=True)
+    game.doRound()
+    game.resetRound()
+    game.dealCards()
+
+    data = Snapshot.save(game)
+    print("Snapshot of", len(game.playerList), "players and", game.deck.getDeckSize(), "cards in deck:", len(data), "bytes")
+    restored = Snapshot.restore(data, headless=True)
+    print("Restored matches:", Snapshot.save(restored) == data)
+
+if __name__ == "__main__":
+    main()
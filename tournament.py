@@ -0,0 +1,140 @@
+from decider import RandomDecider, ThresholdDecider
+from game import Game
+import multiprocessing
+import random
+
+# Returns a RandomDecider for every player, using the game's random number
+# generator so that games can be reproduced
+def makeRandomDeciders(rng, numPlayers):
+    return [RandomDecider(random.Random(rng.random())) for i in range(numPlayers)]
+
+# Returns a ThresholdDecider for every other player and a RandomDecider for
+# the rest
+def makeMixedDeciders(rng, numPlayers):
+    deciders = []
+    for i in range(numPlayers):
+        if i % 2 == 0:
+            deciders.append(ThresholdDecider())
+        else:
+            deciders.append(RandomDecider(random.Random(rng.random())))
+    return deciders
+
+# Returns the seed for the given game of a tournament. Each game gets its own
+# seed, so results don't depend on which worker plays the game.
+def getGameSeed(seed, gameIndex):
+    return str(seed) + ":" + str(gameIndex)
+
+# Plays a single headless game and returns its GameResult. This runs in a
+# worker process, so it must be a top-level function.
+def playTournamentGame(task):
+    gameIndex, seed, playerNames, deciderFactory, startingChips, maxRounds = task
+
+    # The game and its deciders get their own random number generators, both
+    # seeded from the game's seed
+    rng = random.Random(getGameSeed(seed, gameIndex))
+    deciders = deciderFactory(rng, len(playerNames))
+    game = Game(playerNames, startingChips, deciders, headless=True, rng=random.Random(rng.random()))
+    players = [player for player in game.playerList]
+    game.playGame(maxRounds)
+
+    chips = { player.getName(): player.getChips() for player in players }
+    eliminations = [player.getName() for player in game.eliminatedPlayers]
+    winner = None
+    if len(game.playerList) == 1:
+        winner = game.playerList[0].getName()
+    return GameResult(gameIndex, chips, game.roundsPlayed, eliminations, winner)
+
+"""
+GameResult class that holds the outcome of one tournament game.
+"""
+class GameResult:
+    # Constructor with the game's index, every player's final chips (by name),
+    # the number of rounds played, the names of eliminated players in order,
+    # and the winner's name (None if the game ended without one)
+    def __init__(self, gameIndex, chips, roundsPlayed, eliminations, winner):
+        self.gameIndex = gameIndex
+        self.chips = chips
+        self.roundsPlayed = roundsPlayed
+        self.eliminations = eliminations
+        self.winner = winner
+
+"""
+Tournament class that plays many independent headless games across a pool of
+worker processes. Every game is seeded from the tournament's seed and its
+index, so a tournament with the same seed always gives the same results no
+matter how many workers are used.
+"""
+class Tournament:
+    # Constructor with the number of games, the player names in each game, and
+    # optionally the tournament seed, a function that makes each game's
+    # deciders (given the game's Random and number of players; must be a
+    # top-level function so it can be sent to workers), starting chips, the
+    # maximum rounds per game and the number of worker processes
+    def __init__(self, numGames, playerNames, seed = 0, deciderFactory = makeRandomDeciders,
+                 startingChips = 30, maxRounds = 1000, numWorkers = None):
+        self.numGames = numGames
+        self.playerNames = playerNames
+        self.seed = seed
+        self.deciderFactory = deciderFactory
+        self.startingChips = startingChips
+        self.maxRounds = maxRounds
+        self.numWorkers = numWorkers if numWorkers != None else multiprocessing.cpu_count()
+
+        # Aggregated results
+        self.gamesPlayed = 0
+        self.totalRounds = 0
+        self.totalChips = { name: 0 for name in playerNames }
+        self.wins = { name: 0 for name in playerNames }
+        self.eliminations = { name: 0 for name in playerNames }
+
+    # Returns a generator over the tasks sent to workers
+    def getTasks(self):
+        for gameIndex in range(self.numGames):
+            yield (gameIndex, self.seed, self.playerNames, self.deciderFactory, self.startingChips, self.maxRounds)
+
+    # Plays every game, yielding each GameResult as soon as it finishes (not
+    # necessarily in order) and adding it to the totals
+    def run(self):
+        if self.numWorkers <= 1:
+            # Play in this process
+            for task in self.getTasks():
+                result = playTournamentGame(task)
+                self.addResult(result)
+                yield result
+            return
+
+        with multiprocessing.Pool(self.numWorkers) as pool:
+            chunkSize = max(1, self.numGames // (self.numWorkers * 16))
+            for result in pool.imap_unordered(playTournamentGame, self.getTasks(), chunkSize):
+                self.addResult(result)
+                yield result
+
+    # Adds a GameResult to the totals
+    def addResult(self, result):
+        self.gamesPlayed += 1
+        self.totalRounds += result.roundsPlayed
+        for name, chips in result.chips.items():
+            self.totalChips[name] += chips
+        for name in result.eliminations:
+            self.eliminations[name] += 1
+        if result.winner != None:
+            self.wins[result.winner] += 1
+
+    # Prints the totals so far
+    def printSummary(self):
+        print("Games played:", self.gamesPlayed)
+        if self.gamesPlayed <= 0:
+            return
+        print("Average rounds per game:", round(self.totalRounds / self.gamesPlayed, 2))
+        for name in self.playerNames:
+            print("*", name + ":", self.wins[name], "wins,", self.eliminations[name], "eliminations,",
+                  round(self.totalChips[name] / self.gamesPlayed, 2), "average final chips")
+
+def main():
+    tournament = Tournament(200, ["Han", "Lando", "Chewie", "Leia"], seed=1, deciderFactory=makeMixedDeciders)
+    for result in tournament.run():
+        pass
+    tournament.printSummary()
+
+if __name__ == "__main__":
+    main()